@@ -47,6 +47,7 @@ import hashlib
 from itertools import chain
 import re
 import io
+import functools
 
 logger = logging.getLogger(__name__)
 
@@ -116,6 +117,10 @@ papernames = {
     "legal": "Legal",
     "tabloid": "Tabloid",
 }
+# table of paper sizes as shown in the epilog of the --help output
+rendered_papersizes = "".join(
+    "    %-8s %s\n" % (papernames[k], v) for k, v in sorted(papersizes.items())
+)
 
 Engine = Enum("Engine", "internal pdfrw pikepdf")
 
@@ -2900,6 +2905,10 @@ def parse_imgsize_num(num, name):
     return num
 
 
+# The argument parsers below are pure functions of their string argument and
+# return immutable values (tuples of floats and enum members), so their
+# results can be cached.
+@functools.lru_cache(maxsize=256)
 def parse_pagesize_rectarg(string):
     transposed = string.endswith("^T")
     if transposed:
@@ -2922,6 +2931,7 @@ def parse_pagesize_rectarg(string):
     return w, h
 
 
+@functools.lru_cache(maxsize=256)
 def parse_imgsize_rectarg(string):
     transposed = string.endswith("^T")
     if transposed:
@@ -2945,9 +2955,8 @@ def parse_imgsize_rectarg(string):
 
 
 def parse_colorspacearg(string):
-    for c in Colorspace:
-        if c.name == string:
-            return c
+    if string in Colorspace.__members__:
+        return Colorspace[string]
     allowed = ", ".join([c.name for c in Colorspace])
     raise argparse.ArgumentTypeError(
         "Unsupported colorspace: %s. Must be one of: %s." % (string, allowed)
@@ -2955,15 +2964,15 @@ def parse_colorspacearg(string):
 
 
 def parse_enginearg(string):
-    for c in Engine:
-        if c.name == string:
-            return c
+    if string in Engine.__members__:
+        return Engine[string]
     allowed = ", ".join([c.name for c in Engine])
     raise argparse.ArgumentTypeError(
         "Unsupported engine: %s. Must be one of: %s." % (string, allowed)
     )
 
 
+@functools.lru_cache(maxsize=256)
 def parse_borderarg(string):
     if ":" in string:
         h, v = string.split(":", 1)
@@ -3040,34 +3049,34 @@ def input_images(path_expr):
     return result
 
 
+@functools.lru_cache(maxsize=256)
 def parse_rotationarg(string):
-    for m in Rotation:
-        if m.name == string.lower():
-            return m
+    if string.lower() in Rotation.__members__:
+        return Rotation[string.lower()]
     raise argparse.ArgumentTypeError("unknown rotation value: %s" % string)
 
 
+@functools.lru_cache(maxsize=256)
 def parse_fitarg(string):
-    for m in FitMode:
-        if m.name == string.lower():
-            return m
+    if string.lower() in FitMode.__members__:
+        return FitMode[string.lower()]
     raise argparse.ArgumentTypeError("unknown fit mode: %s" % string)
 
 
+@functools.lru_cache(maxsize=256)
 def parse_panes(string):
-    for m in PageMode:
-        if m.name == string.lower():
-            return m
+    if string.lower() in PageMode.__members__:
+        return PageMode[string.lower()]
     allowed = ", ".join([m.name for m in PageMode])
     raise argparse.ArgumentTypeError(
         "Unsupported page mode: %s. Must be one of: %s." % (string, allowed)
     )
 
 
+@functools.lru_cache(maxsize=256)
 def parse_magnification(string):
-    for m in Magnification:
-        if m.name == string.lower():
-            return m
+    if string.lower() in Magnification.__members__:
+        return Magnification[string.lower()]
     try:
         return float(string)
     except ValueError:
@@ -3079,10 +3088,10 @@ def parse_magnification(string):
     )
 
 
+@functools.lru_cache(maxsize=256)
 def parse_layout(string):
-    for l in PageLayout:
-        if l.name == string.lower():
-            return l
+    if string.lower() in PageLayout.__members__:
+        return PageLayout[string.lower()]
     allowed = ", ".join([l.name for l in PageLayout])
     raise argparse.ArgumentTypeError(
         "Unsupported page layout: %s. Must be one of: %s." % (string, allowed)
@@ -3129,6 +3138,7 @@ def valid_date(string):
 
 
 def gui():
+    import math
     import tkinter
     import tkinter.filedialog
 
@@ -3138,6 +3148,14 @@ def gui():
     except ImportError:
         have_fitz = False
 
+    # ImageTk is packaged separately from the rest of Pillow by some
+    # distributions, so fall back to letting Tk decode PPM data
+    have_imagetk = True
+    try:
+        from PIL import ImageTk
+    except ImportError:
+        have_imagetk = False
+
     # from Python 3.7 Lib/idlelib/configdialog.py
     # Copyright 2015-2017 Terry Jan Reedy
     # Python License
@@ -3255,6 +3273,18 @@ def gui():
     maxpagewidth = 0
     maxpageheight = 0
     doc = None
+    # parsing the page content stream is expensive, so keep one display list
+    # per page number around and only rasterize it again when resizing
+    displaylist_cache = {}
+    # recently shown previews by page number and zoom step, the least
+    # recently used one comes first
+    photo_cache = {}
+    photo_cache_size = 8
+    # pages only showing grayscale images are rendered with a single channel
+    page_colorspace = {}
+    # canvas size and maximum page dimensions of the last drawing, if none of
+    # these changed, then the canvas already shows the right thing
+    last_draw_state = None
 
     args = {
         "engine": tkinter.StringVar(),
@@ -3303,6 +3333,7 @@ def gui():
         nonlocal doc
         nonlocal maxpagewidth
         nonlocal maxpageheight
+        nonlocal last_draw_state
         infiles = tkinter.filedialog.askopenfilenames(
             parent=root,
             title="open image",
@@ -3316,18 +3347,29 @@ def gui():
             # initialdir="/home/josch/git/plakativ",
             # initialfile="test.pdf",
         )
+        displaylist_cache.clear()
+        photo_cache.clear()
+        page_colorspace.clear()
+        last_draw_state = None
         if have_fitz:
             with BytesIO() as f:
                 save_pdf(f)
                 f.seek(0)
                 doc = fitz.open(stream=f, filetype="pdf")
-            for page in doc:
-                if page.getDisplayList().rect.width > maxpagewidth:
-                    maxpagewidth = page.getDisplayList().rect.width
-                if page.getDisplayList().rect.height > maxpageheight:
-                    maxpageheight = page.getDisplayList().rect.height
+            for pagenum, page in enumerate(doc):
+                displaylist = page.getDisplayList()
+                displaylist_cache[pagenum] = displaylist
+                if displaylist.rect.width > maxpagewidth:
+                    maxpagewidth = displaylist.rect.width
+                if displaylist.rect.height > maxpageheight:
+                    maxpageheight = displaylist.rect.height
         draw()
 
+    def get_or_none(key):
+        # every get() is a round trip to the Tcl interpreter, so only do it once
+        value = args[key].get()
+        return value if value else None
+
     def save_pdf(stream):
         pagesizearg = None
         if args["pagesize_dropdown"].get() == "auto":
@@ -3354,23 +3396,23 @@ def gui():
             pagesizearg,
             imgsizearg,
             borderarg,
-            args["fit"].get(),
+            FitMode[args["fit"].get()],
             args["auto_orient"].get(),
         )
         viewer_panesarg = None
         if args["viewer_panes"].get() == "auto":
             # nothing to do
             pass
-        elif args["viewer_panes"].get() in PageMode:
-            viewer_panesarg = args["viewer_panes"].get()
+        elif args["viewer_panes"].get() in PageMode.__members__:
+            viewer_panesarg = PageMode[args["viewer_panes"].get()]
         else:
             raise Exception("no such viewer_panes: %s" % args["viewer_panes"].get())
         viewer_magnificationarg = None
         if args["viewer_magnification"].get() == "auto":
             # nothing to do
             pass
-        elif args["viewer_magnification"].get() in Magnification:
-            viewer_magnificationarg = args["viewer_magnification"].get()
+        elif args["viewer_magnification"].get() in Magnification.__members__:
+            viewer_magnificationarg = Magnification[args["viewer_magnification"].get()]
         else:
             raise Exception(
                 "no such viewer_magnification: %s" % args["viewer_magnification"].get()
@@ -3379,41 +3421,38 @@ def gui():
         if args["viewer_page_layout"].get() == "auto":
             # nothing to do
             pass
-        elif args["viewer_page_layout"].get() in PageLayout:
-            viewer_page_layoutarg = args["viewer_page_layout"].get()
+        elif args["viewer_page_layout"].get() in PageLayout.__members__:
+            viewer_page_layoutarg = PageLayout[args["viewer_page_layout"].get()]
         else:
             raise Exception(
                 "no such viewer_page_layout: %s" % args["viewer_page_layout"].get()
             )
         colorspacearg = None
         if args["colorspace"].get() != "auto":
-            colorspacearg = next(
-                v for v in Colorspace if v.name == args["colorspace"].get()
-            )
+            colorspacearg = Colorspace[args["colorspace"].get()]
         enginearg = None
         if args["engine"].get() != "auto":
-            enginearg = next(v for v in Engine if v.name == args["engine"].get())
+            enginearg = Engine[args["engine"].get()]
+        viewer_initial_pagearg = args["viewer_initial_page"].get()
+        if viewer_initial_pagearg <= 1:
+            viewer_initial_pagearg = None
 
         convert(
             *infiles,
             engine=enginearg,
-            title=args["title"].get() if args["title"].get() else None,
-            author=args["author"].get() if args["author"].get() else None,
-            creator=args["creator"].get() if args["creator"].get() else None,
-            producer=args["producer"].get() if args["producer"].get() else None,
-            creationdate=args["creationdate"].get()
-            if args["creationdate"].get()
-            else None,
-            moddate=args["moddate"].get() if args["moddate"].get() else None,
-            subject=args["subject"].get() if args["subject"].get() else None,
-            keywords=args["keywords"].get() if args["keywords"].get() else None,
+            title=get_or_none("title"),
+            author=get_or_none("author"),
+            creator=get_or_none("creator"),
+            producer=get_or_none("producer"),
+            creationdate=get_or_none("creationdate"),
+            moddate=get_or_none("moddate"),
+            subject=get_or_none("subject"),
+            keywords=get_or_none("keywords"),
             colorspace=colorspacearg,
             nodate=args["nodate"].get(),
             layout_fun=layout_fun,
             viewer_panes=viewer_panesarg,
-            viewer_initial_page=args["viewer_initial_page"].get()
-            if args["viewer_initial_page"].get() > 1
-            else None,
+            viewer_initial_page=viewer_initial_pagearg,
             viewer_magnification=viewer_magnificationarg,
             viewer_page_layout=viewer_page_layoutarg,
             viewer_fit_window=(args["viewer_fit_window"].get() or None),
@@ -3443,10 +3482,40 @@ def gui():
     app.pack(fill=tkinter.BOTH, expand=tkinter.TRUE)
 
     canvas = tkinter.Canvas(app, bg="black")
+    # ids of the image and frame items while a preview is shown
+    canvas.preview_items = None
+
+    def show_preview(key, photo, zoom):
+        photo_cache[key] = photo
+        while len(photo_cache) > photo_cache_size:
+            del photo_cache[next(iter(photo_cache))]
+        canvas.image = photo
+        # top left corner of the centered page
+        left = (canvas.size[0] - maxpagewidth * zoom) / 2
+        top = (canvas.size[1] - maxpageheight * zoom) / 2
+        right = left + canvas.image.width()
+        bottom = top + canvas.image.height()
+        # moving the existing canvas items is cheaper than recreating them
+        if canvas.preview_items is not None:
+            image_id, frame_id = canvas.preview_items
+            canvas.itemconfigure(image_id, image=canvas.image)
+            canvas.coords(image_id, left, top)
+            canvas.coords(frame_id, left, top, right, bottom)
+            return
+        canvas.delete(tkinter.ALL)
+        canvas.preview_items = (
+            canvas.create_image(left, top, anchor=tkinter.NW, image=canvas.image),
+            canvas.create_rectangle(left, top, right, bottom, outline="red"),
+        )
 
     def draw():
-        canvas.delete(tkinter.ALL)
+        nonlocal last_draw_state
+        if last_draw_state == (canvas.size, maxpagewidth, maxpageheight):
+            return
+        last_draw_state = (canvas.size, maxpagewidth, maxpageheight)
         if not infiles:
+            canvas.delete(tkinter.ALL)
+            canvas.preview_items = None
             canvas.create_text(
                 canvas.size[0] / 2,
                 canvas.size[1] / 2,
@@ -3456,6 +3525,8 @@ def gui():
             return
 
         if not doc:
+            canvas.delete(tkinter.ALL)
+            canvas.preview_items = None
             canvas.create_text(
                 canvas.size[0] / 2,
                 canvas.size[1] / 2,
@@ -3468,37 +3539,78 @@ def gui():
         canvas_padding = 10
         # factor to convert from pdf dimensions (given in pt) into canvas
         # dimensions (given in pixels)
+        # since the largest page always fits into the canvas, every page is
+        # fully visible and there is no need to clip the rendered pixmap
         zoom = min(
             (canvas.size[0] - canvas_padding) / maxpagewidth,
             (canvas.size[1] - canvas_padding) / maxpageheight,
         )
+        if zoom <= 0:
+            canvas.delete(tkinter.ALL)
+            canvas.preview_items = None
+            return
+        # round the zoom down to steps of 2% so that a preview which was
+        # rendered for a similar canvas size can be shown again without
+        # rasterizing the page and decoding the result again
+        zoomstep = math.floor(math.log(zoom, 1.02))
+        zoom = 1.02**zoomstep
 
         pagenum = 0
+        photo = photo_cache.pop((pagenum, zoomstep), None)
+        if photo is not None:
+            show_preview((pagenum, zoomstep), photo, zoom)
+            return
+        displaylist = displaylist_cache.get(pagenum)
+        if displaylist is None:
+            displaylist = displaylist_cache[pagenum] = doc[pagenum].getDisplayList()
+        colorspace = page_colorspace.get(pagenum)
+        if colorspace is None:
+            # the sixth element of each image list entry is the name of the
+            # colorspace of that image, a page without images is drawn in RGB
+            imagelist = doc[pagenum].getImageList()
+            if imagelist and all(img[5] == "DeviceGray" for img in imagelist):
+                colorspace = page_colorspace[pagenum] = fitz.csGRAY
+            else:
+                colorspace = page_colorspace[pagenum] = fitz.csRGB
         mat_0 = fitz.Matrix(zoom, zoom)
-        canvas.image = tkinter.PhotoImage(
-            data=doc[pagenum]
-            .getDisplayList()
-            .getPixmap(matrix=mat_0, alpha=False)
-            .getImageData("ppm")
-        )
-        canvas.create_image(
-            (canvas.size[0] - maxpagewidth * zoom) / 2,
-            (canvas.size[1] - maxpageheight * zoom) / 2,
-            anchor=tkinter.NW,
-            image=canvas.image,
+        pixmap = displaylist.getPixmap(
+            matrix=mat_0,
+            colorspace=colorspace,
+            alpha=False,
         )
+        if have_imagetk:
+            # hand the raw samples to Tk without encoding them as PPM
+            mode = "L" if pixmap.n == 1 else "RGB"
+            photo = ImageTk.PhotoImage(
+                Image.frombuffer(
+                    mode,
+                    (pixmap.width, pixmap.height),
+                    pixmap.samples,
+                    "raw",
+                    mode,
+                    pixmap.stride,
+                    1,
+                )
+            )
+        else:
+            photo = tkinter.PhotoImage(data=pixmap.getImageData("ppm"))
+        show_preview((pagenum, zoomstep), photo, zoom)
 
-        canvas.create_rectangle(
-            (canvas.size[0] - maxpagewidth * zoom) / 2,
-            (canvas.size[1] - maxpageheight * zoom) / 2,
-            (canvas.size[0] - maxpagewidth * zoom) / 2 + canvas.image.width(),
-            (canvas.size[1] - maxpageheight * zoom) / 2 + canvas.image.height(),
-            outline="red",
-        )
+    # while the window is being resized, Tk emits a burst of <Configure>
+    # events, so only redraw once the size stayed the same for a short while
+    pending_draw = None
+
+    def on_idle_draw():
+        nonlocal pending_draw
+        pending_draw = None
+        draw()
 
     def on_resize(event):
+        nonlocal pending_draw
         canvas.size = (event.width, event.height)
-        draw()
+        if pending_draw is not None:
+            canvas.after_cancel(pending_draw)
+        pending_draw = canvas.after(75, on_idle_draw)
 
     canvas.pack(fill=tkinter.BOTH, side=tkinter.LEFT, expand=tkinter.TRUE)
     canvas.bind("<Configure>", on_resize)
@@ -3531,112 +3643,57 @@ def gui():
     OptionMenu(output_options, args["engine"], "auto", state=tkinter.DISABLED).grid(
         row=1, column=1, sticky=tkinter.W
     )
-    tkinter.Checkbutton(
-        output_options,
-        text="Suppress timestamp",
-        variable=args["nodate"],
-        state=tkinter.DISABLED,
-    ).grid(row=2, column=0, columnspan=2, sticky=tkinter.W)
-    tkinter.Checkbutton(
-        output_options,
-        text="only first frame",
-        variable=args["first_frame_only"],
-        state=tkinter.DISABLED,
-    ).grid(row=3, column=0, columnspan=2, sticky=tkinter.W)
-    tkinter.Checkbutton(
-        output_options, text="force large input", state=tkinter.DISABLED
-    ).grid(row=4, column=0, columnspan=2, sticky=tkinter.W)
-    image_size_frame = tkinter.LabelFrame(frame1.interior, text="Image size")
-    image_size_frame.pack(side=tkinter.TOP, expand=tkinter.TRUE, fill=tkinter.X)
-    OptionMenu(
-        image_size_frame,
-        args["imgsize_dropdown"],
-        *(["auto", "custom"] + sorted(papernames.values())),
-        state=tkinter.DISABLED,
-    ).grid(row=1, column=0, columnspan=3, sticky=tkinter.W)
-
-    tkinter.Label(
-        image_size_frame, text="Width:", state=tkinter.DISABLED, name="size_label_width"
-    ).grid(row=2, column=0, sticky=tkinter.W)
-    tkinter.Spinbox(
-        image_size_frame,
-        format="%.2f",
-        increment=0.01,
-        from_=0,
-        to=100,
-        width=5,
-        state=tkinter.DISABLED,
-        name="spinbox_width",
-    ).grid(row=2, column=1, sticky=tkinter.W)
-    tkinter.Label(
-        image_size_frame, text="mm", state=tkinter.DISABLED, name="size_label_width_mm"
-    ).grid(row=2, column=2, sticky=tkinter.W)
-
-    tkinter.Label(
-        image_size_frame,
-        text="Height:",
-        state=tkinter.DISABLED,
-        name="size_label_height",
-    ).grid(row=3, column=0, sticky=tkinter.W)
-    tkinter.Spinbox(
-        image_size_frame,
-        format="%.2f",
-        increment=0.01,
-        from_=0,
-        to=100,
-        width=5,
-        state=tkinter.DISABLED,
-        name="spinbox_height",
-    ).grid(row=3, column=1, sticky=tkinter.W)
-    tkinter.Label(
-        image_size_frame, text="mm", state=tkinter.DISABLED, name="size_label_height_mm"
-    ).grid(row=3, column=2, sticky=tkinter.W)
-
-    page_size_frame = tkinter.LabelFrame(frame1.interior, text="Page size")
-    page_size_frame.pack(side=tkinter.TOP, expand=tkinter.TRUE, fill=tkinter.X)
-    OptionMenu(
-        page_size_frame,
-        args["pagesize_dropdown"],
-        *(["auto", "custom"] + sorted(papernames.values())),
-        state=tkinter.DISABLED,
-    ).grid(row=1, column=0, columnspan=3, sticky=tkinter.W)
-
-    tkinter.Label(
-        page_size_frame, text="Width:", state=tkinter.DISABLED, name="size_label_width"
-    ).grid(row=2, column=0, sticky=tkinter.W)
-    tkinter.Spinbox(
-        page_size_frame,
-        format="%.2f",
-        increment=0.01,
-        from_=0,
-        to=100,
-        width=5,
-        state=tkinter.DISABLED,
-        name="spinbox_width",
-    ).grid(row=2, column=1, sticky=tkinter.W)
-    tkinter.Label(
-        page_size_frame, text="mm", state=tkinter.DISABLED, name="size_label_width_mm"
-    ).grid(row=2, column=2, sticky=tkinter.W)
+    for row, (text, variable) in enumerate(
+        [
+            ("Suppress timestamp", args["nodate"]),
+            ("only first frame", args["first_frame_only"]),
+            ("force large input", None),
+        ],
+        start=2,
+    ):
+        tkinter.Checkbutton(
+            output_options, text=text, variable=variable, state=tkinter.DISABLED
+        ).grid(row=row, column=0, columnspan=2, sticky=tkinter.W)
+
+    # the image size and page size frames only differ in their title and the
+    # variable holding the selected size
+    size_choices = ["auto", "custom"] + sorted(papernames.values())
+    for text, variable in [
+        ("Image size", args["imgsize_dropdown"]),
+        ("Page size", args["pagesize_dropdown"]),
+    ]:
+        size_frame = tkinter.LabelFrame(frame1.interior, text=text)
+        size_frame.pack(side=tkinter.TOP, expand=tkinter.TRUE, fill=tkinter.X)
+        OptionMenu(
+            size_frame,
+            variable,
+            *size_choices,
+            state=tkinter.DISABLED,
+        ).grid(row=1, column=0, columnspan=3, sticky=tkinter.W)
+        for row, dimension in [(2, "width"), (3, "height")]:
+            tkinter.Label(
+                size_frame,
+                text=dimension.capitalize() + ":",
+                state=tkinter.DISABLED,
+                name="size_label_" + dimension,
+            ).grid(row=row, column=0, sticky=tkinter.W)
+            tkinter.Spinbox(
+                size_frame,
+                format="%.2f",
+                increment=0.01,
+                from_=0,
+                to=100,
+                width=5,
+                state=tkinter.DISABLED,
+                name="spinbox_" + dimension,
+            ).grid(row=row, column=1, sticky=tkinter.W)
+            tkinter.Label(
+                size_frame,
+                text="mm",
+                state=tkinter.DISABLED,
+                name="size_label_" + dimension + "_mm",
+            ).grid(row=row, column=2, sticky=tkinter.W)
 
-    tkinter.Label(
-        page_size_frame,
-        text="Height:",
-        state=tkinter.DISABLED,
-        name="size_label_height",
-    ).grid(row=3, column=0, sticky=tkinter.W)
-    tkinter.Spinbox(
-        page_size_frame,
-        format="%.2f",
-        increment=0.01,
-        from_=0,
-        to=100,
-        width=5,
-        state=tkinter.DISABLED,
-        name="spinbox_height",
-    ).grid(row=3, column=1, sticky=tkinter.W)
-    tkinter.Label(
-        page_size_frame, text="mm", state=tkinter.DISABLED, name="size_label_height_mm"
-    ).grid(row=3, column=2, sticky=tkinter.W)
     layout_frame = tkinter.LabelFrame(frame1.interior, text="Layout")
     layout_frame.pack(side=tkinter.TOP, expand=tkinter.TRUE, fill=tkinter.X)
     tkinter.Label(layout_frame, text="border", state=tkinter.DISABLED).grid(
@@ -3657,80 +3714,37 @@ def gui():
         state=tkinter.DISABLED,
         variable=args["auto_orient"],
     ).grid(row=2, column=0, columnspan=2, sticky=tkinter.W)
-    tkinter.Label(layout_frame, text="crop border", state=tkinter.DISABLED).grid(
-        row=3, column=0, sticky=tkinter.W
-    )
-    tkinter.Spinbox(layout_frame, state=tkinter.DISABLED).grid(
-        row=3, column=1, sticky=tkinter.W
-    )
-    tkinter.Label(layout_frame, text="bleed border", state=tkinter.DISABLED).grid(
-        row=4, column=0, sticky=tkinter.W
-    )
-    tkinter.Spinbox(layout_frame, state=tkinter.DISABLED).grid(
-        row=4, column=1, sticky=tkinter.W
-    )
-    tkinter.Label(layout_frame, text="trim border", state=tkinter.DISABLED).grid(
-        row=5, column=0, sticky=tkinter.W
-    )
-    tkinter.Spinbox(layout_frame, state=tkinter.DISABLED).grid(
-        row=5, column=1, sticky=tkinter.W
-    )
-    tkinter.Label(layout_frame, text="art border", state=tkinter.DISABLED).grid(
-        row=6, column=0, sticky=tkinter.W
-    )
-    tkinter.Spinbox(layout_frame, state=tkinter.DISABLED).grid(
-        row=6, column=1, sticky=tkinter.W
-    )
+    for row, text in enumerate(
+        ["crop border", "bleed border", "trim border", "art border"], start=3
+    ):
+        tkinter.Label(layout_frame, text=text, state=tkinter.DISABLED).grid(
+            row=row, column=0, sticky=tkinter.W
+        )
+        tkinter.Spinbox(layout_frame, state=tkinter.DISABLED).grid(
+            row=row, column=1, sticky=tkinter.W
+        )
+
     metadata_frame = tkinter.LabelFrame(frame1.interior, text="PDF metadata")
     metadata_frame.pack(side=tkinter.TOP, expand=tkinter.TRUE, fill=tkinter.X)
-    tkinter.Label(metadata_frame, text="title", state=tkinter.DISABLED).grid(
-        row=0, column=0, sticky=tkinter.W
-    )
-    tkinter.Entry(
-        metadata_frame, textvariable=args["title"], state=tkinter.DISABLED
-    ).grid(row=0, column=1, sticky=tkinter.W)
-    tkinter.Label(metadata_frame, text="author", state=tkinter.DISABLED).grid(
-        row=1, column=0, sticky=tkinter.W
-    )
-    tkinter.Entry(
-        metadata_frame, textvariable=args["author"], state=tkinter.DISABLED
-    ).grid(row=1, column=1, sticky=tkinter.W)
-    tkinter.Label(metadata_frame, text="creator", state=tkinter.DISABLED).grid(
-        row=2, column=0, sticky=tkinter.W
-    )
-    tkinter.Entry(
-        metadata_frame, textvariable=args["creator"], state=tkinter.DISABLED
-    ).grid(row=2, column=1, sticky=tkinter.W)
-    tkinter.Label(metadata_frame, text="producer", state=tkinter.DISABLED).grid(
-        row=3, column=0, sticky=tkinter.W
-    )
-    tkinter.Entry(
-        metadata_frame, textvariable=args["producer"], state=tkinter.DISABLED
-    ).grid(row=3, column=1, sticky=tkinter.W)
-    tkinter.Label(metadata_frame, text="creation date", state=tkinter.DISABLED).grid(
-        row=4, column=0, sticky=tkinter.W
-    )
-    tkinter.Entry(
-        metadata_frame, textvariable=args["creationdate"], state=tkinter.DISABLED
-    ).grid(row=4, column=1, sticky=tkinter.W)
-    tkinter.Label(
-        metadata_frame, text="modification date", state=tkinter.DISABLED
-    ).grid(row=5, column=0, sticky=tkinter.W)
-    tkinter.Entry(
-        metadata_frame, textvariable=args["moddate"], state=tkinter.DISABLED
-    ).grid(row=5, column=1, sticky=tkinter.W)
-    tkinter.Label(metadata_frame, text="subject", state=tkinter.DISABLED).grid(
-        row=6, column=0, sticky=tkinter.W
-    )
-    tkinter.Entry(metadata_frame, state=tkinter.DISABLED).grid(
-        row=6, column=1, sticky=tkinter.W
-    )
-    tkinter.Label(metadata_frame, text="keywords", state=tkinter.DISABLED).grid(
-        row=7, column=0, sticky=tkinter.W
-    )
-    tkinter.Entry(metadata_frame, state=tkinter.DISABLED).grid(
-        row=7, column=1, sticky=tkinter.W
-    )
+    for row, (text, key) in enumerate(
+        [
+            ("title", "title"),
+            ("author", "author"),
+            ("creator", "creator"),
+            ("producer", "producer"),
+            ("creation date", "creationdate"),
+            ("modification date", "moddate"),
+            ("subject", "subject"),
+            ("keywords", "keywords"),
+        ]
+    ):
+        tkinter.Label(metadata_frame, text=text, state=tkinter.DISABLED).grid(
+            row=row, column=0, sticky=tkinter.W
+        )
+        tkinter.Entry(
+            metadata_frame, textvariable=args[key], state=tkinter.DISABLED
+        ).grid(row=row, column=1, sticky=tkinter.W)
+
     viewer_frame = tkinter.LabelFrame(frame1.interior, text="PDF viewer options")
     viewer_frame.pack(side=tkinter.TOP, expand=tkinter.TRUE, fill=tkinter.X)
     tkinter.Label(viewer_frame, text="panes", state=tkinter.DISABLED).grid(
@@ -3773,24 +3787,17 @@ def gui():
         *(["auto"] + [v.name for v in PageLayout]),
         state=tkinter.DISABLED,
     ).grid(row=3, column=1, sticky=tkinter.W)
-    tkinter.Checkbutton(
-        viewer_frame,
-        text="fit window to page size",
-        variable=args["viewer_fit_window"],
-        state=tkinter.DISABLED,
-    ).grid(row=4, column=0, columnspan=2, sticky=tkinter.W)
-    tkinter.Checkbutton(
-        viewer_frame,
-        text="center window",
-        variable=args["viewer_center_window"],
-        state=tkinter.DISABLED,
-    ).grid(row=5, column=0, columnspan=2, sticky=tkinter.W)
-    tkinter.Checkbutton(
-        viewer_frame,
-        text="open in fullscreen",
-        variable=args["viewer_fullscreen"],
-        state=tkinter.DISABLED,
-    ).grid(row=6, column=0, columnspan=2, sticky=tkinter.W)
+    for row, (text, key) in enumerate(
+        [
+            ("fit window to page size", "viewer_fit_window"),
+            ("center window", "viewer_center_window"),
+            ("open in fullscreen", "viewer_fullscreen"),
+        ],
+        start=4,
+    ):
+        tkinter.Checkbutton(
+            viewer_frame, text=text, variable=args[key], state=tkinter.DISABLED
+        ).grid(row=row, column=0, columnspan=2, sticky=tkinter.W)
 
     option_frame = tkinter.LabelFrame(frame1.interior, text="Program options")
     option_frame.pack(side=tkinter.TOP, expand=tkinter.TRUE, fill=tkinter.X)
@@ -3827,8 +3834,20 @@ def gui():
 
 
 def file_is_icc(fname):
-    with open(fname, "rb") as f:
-        data = f.read(40)
+    # use the unbuffered os functions because we only need the first 40 bytes
+    # and a file we cannot read is not an error but just not an ICC profile
+    # O_BINARY only exists on Windows, where files are opened in text mode
+    # otherwise
+    try:
+        fd = os.open(fname, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    except OSError:
+        return False
+    try:
+        data = os.read(fd, 40)
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
     if len(data) < 40:
         return False
     return data[36:] == b"acsp"
@@ -3840,25 +3859,23 @@ def validate_icc(fname):
     return fname
 
 
+# the result does not change while the program runs
+@functools.lru_cache(maxsize=1)
 def get_default_icc_profile():
     for profile in [
         "/usr/share/color/icc/sRGB.icc",
         "/usr/share/color/icc/OpenICC/sRGB.icc",
         "/usr/share/color/icc/colord/sRGB.icc",
     ]:
-        if not os.path.exists(profile):
-            continue
-        if not file_is_icc(profile):
-            continue
-        return profile
+        if file_is_icc(profile):
+            return profile
     return "/usr/share/color/icc/sRGB.icc"
 
 
+# building the parser is not free and callers only ever read from it, so
+# build it once and let repeated calls of main() share it
+@functools.lru_cache(maxsize=1)
 def get_main_parser():
-    rendered_papersizes = ""
-    for k, v in sorted(papersizes.items()):
-        rendered_papersizes += "    %-8s %s\n" % (papernames[k], v)
-
     parser = argparse.ArgumentParser(
         formatter_class=argparse.RawDescriptionHelpFormatter,
         description="""\
@@ -3950,6 +3967,11 @@ Argument parsing:
   The order of non-positional arguments (all arguments other than the input
   images) does not matter.
 
+Environment:
+  If IMG2PDF_FAST_CLI is set to 1, then invocations that only consist of input
+  file names and an optional -o/--output are parsed without setting up the full
+  argument parser. Any other invocation is handled as usual.
+
 Examples:
   Lines starting with a dollar sign denote commands you can enter into your
   terminal. The dollar sign signifies your command prompt. It is not part of
@@ -4039,17 +4061,14 @@ Report bugs at https://gitlab.mister-muffin.de/josch/img2pdf/issues
         description="Arguments controlling the output format.",
     )
 
-    # In Python3 we have to output to sys.stdout.buffer because we write are
-    # bytes and not strings. In certain situations, like when the main
-    # function is wrapped by contextlib.redirect_stdout(), sys.stdout does not
-    # have the buffer attribute. Thus we write to sys.stdout by default and
-    # to sys.stdout.buffer if it exists.
+    # The default output is standard output. It is filled in by main() when
+    # the arguments are parsed and not here because the parser is cached and
+    # sys.stdout might have been replaced in the meantime.
     outargs.add_argument(
         "-o",
         "--output",
         metavar="out",
         type=argparse.FileType("wb"),
-        default=sys.stdout.buffer if hasattr(sys.stdout, "buffer") else sys.stdout,
         help="Makes the program output to a file instead of standard output.",
     )
     outargs.add_argument(
@@ -4435,8 +4454,101 @@ and left/right, respectively. It is not possible to specify asymmetric borders.
     return parser
 
 
+def parse_fast_args(argv):
+    # Recognize the most common invocation, a list of input images with an
+    # optional -o/--output, without building the full argparse parser. If
+    # anything else is found, None is returned and the caller has to fall
+    # back to the full parser which then also takes care of error reporting.
+    images = []
+    output = None
+    # argparse only accepts a single run of positional arguments, so images
+    # on both sides of -o are an error for the full parser
+    images_done = False
+    it = iter(argv)
+    for arg in it:
+        if arg in ["-o", "--output"]:
+            if output is not None:
+                return None
+            output = next(it, None)
+            if output is None or output.startswith("-"):
+                return None
+            images_done = len(images) > 0
+        elif arg.startswith("-") or images_done:
+            return None
+        else:
+            images.append(arg)
+    if len(images) == 0:
+        return None
+    try:
+        images = [input_images(path_expr) for path_expr in images]
+    except argparse.ArgumentTypeError:
+        return None
+    if output is not None:
+        try:
+            output = open(output, "wb")
+        except OSError:
+            return None
+    # these values must match the defaults of the parser returned by
+    # get_main_parser(), which test_parse_fast_args checks
+    return argparse.Namespace(
+        images=images,
+        verbose=False,
+        gui=False,
+        from_file=[],
+        output=output,
+        colorspace=None,
+        nodate=False,
+        engine=None,
+        first_frame_only=False,
+        include_thumbnails=False,
+        pillow_limit_break=False,
+        pdfa=None,
+        pagesize=None,
+        imgsize=None,
+        border=None,
+        fit=FitMode.into,
+        auto_orient=False,
+        rotation=Rotation.auto,
+        crop_border=None,
+        bleed_border=None,
+        trim_border=None,
+        art_border=None,
+        title=None,
+        author=None,
+        creator=None,
+        producer="img2pdf " + __version__,
+        creationdate=None,
+        moddate=None,
+        subject=None,
+        keywords=None,
+        viewer_panes=None,
+        viewer_initial_page=None,
+        viewer_magnification=None,
+        viewer_page_layout=None,
+        viewer_fit_window=False,
+        viewer_center_window=False,
+        viewer_fullscreen=False,
+    )
+
+
 def main(argv=sys.argv):
-    args = get_main_parser().parse_args(argv[1:])
+    args = None
+    if os.environ.get("IMG2PDF_FAST_CLI") == "1":
+        args = parse_fast_args(argv[1:])
+    # the fast path only accepts input images and an output file, so the
+    # error checks below which need the parser cannot fail in that case
+    parser = None
+    if args is None:
+        parser = get_main_parser()
+        args = parser.parse_args(argv[1:])
+
+    if args.output is None:
+        # In Python3 we have to output to sys.stdout.buffer because we write
+        # are bytes and not strings. In certain situations, like when the main
+        # function is wrapped by contextlib.redirect_stdout(), sys.stdout does
+        # not have the buffer attribute. Thus we write to sys.stdout by default
+        # and to sys.stdout.buffer if it exists.
+        args.output = sys.stdout.buffer if hasattr(sys.stdout, "buffer") else sys.stdout
 
     if args.verbose:
         logging.basicConfig(level=logging.DEBUG)
@@ -14,7 +14,9 @@ import img2pdf
 import os
 from io import BytesIO
 from PIL import Image
+import bisect
 import decimal
+import functools
 from packaging.version import parse as parse_version
 import warnings
 import json
@@ -33,11 +35,22 @@ ICC_PROFILE_PATHS = (
     # Archlinux and Gentoo
     "/usr/share/ghostscript/*/iccprofiles/srgb.icc",
 )
-for glob in ICC_PROFILE_PATHS:
-    for path in pathlib.Path("/").glob(glob.lstrip("/")):
-        if path.is_file():
-            ICC_PROFILE = path
-            break
+for pattern in ICC_PROFILE_PATHS:
+    if "*" in pattern:
+        # only patterns with wildcards need to list directory contents
+        paths = sorted(pathlib.Path("/").glob(pattern.lstrip("/")))
+    else:
+        paths = [pathlib.Path(pattern)]
+    ICC_PROFILE = next((path for path in paths if path.is_file()), None)
+    if ICC_PROFILE is not None:
+        break
+
+
+# regular expressions for parsing the output of the tools probed below
+mutool_version_re = re.compile(r"mutool version ([0-9.]+)\n")
+pdfimages_version_re = re.compile(r"pdfimages version ([0-9.]+)")
+imagemagick_version_re = re.compile(r"Version: ImageMagick ([0-9.]+-[0-9]+) .*")
+imagemagick_jp2_re = re.compile(rb"\s+JP2\* JP2\s+rw-\s+JPEG-2000 File Format Syntax")
 
 HAVE_FAKETIME = True
 try:
@@ -50,7 +63,7 @@ except FileNotFoundError:
 HAVE_MUTOOL = True
 try:
     ver = subprocess.check_output(["mutool", "-v"], stderr=subprocess.STDOUT)
-    m = re.fullmatch(r"mutool version ([0-9.]+)\n", ver.decode("utf8"))
+    m = mutool_version_re.fullmatch(ver.decode("utf8"))
     if m is None:
         HAVE_MUTOOL = False
     else:
@@ -65,7 +78,7 @@ if not HAVE_MUTOOL:
 HAVE_PDFIMAGES_CMYK = True
 try:
     ver = subprocess.check_output(["pdfimages", "-v"], stderr=subprocess.STDOUT)
-    m = re.fullmatch(r"pdfimages version ([0-9.]+)", ver.split(b"\n")[0].decode("utf8"))
+    m = pdfimages_version_re.fullmatch(ver.split(b"\n")[0].decode("utf8"))
     if m is None:
         HAVE_PDFIMAGES_CMYK = False
     else:
@@ -77,20 +90,25 @@ except FileNotFoundError:
 if not HAVE_PDFIMAGES_CMYK:
     warnings.warn("pdfimages >= 0.42.0 not available, skipping CMYK checks...")
 
+# if the ImageMagick 6 style commands are not available, fall back to calling
+# them as subcommands of the ImageMagick 7 magick command -- a program of the
+# same name is not enough, for example on Windows, convert is the filesystem
+# converter, so check that it is ImageMagick
 for prog in ["convert", "compare", "identify"]:
     try:
-        subprocess.check_call([prog] + ["-version"], stderr=subprocess.STDOUT)
+        ver = subprocess.check_output([prog, "-version"], stderr=subprocess.STDOUT)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        ver = b""
+    if b"ImageMagick" in ver:
         globals()[prog.upper()] = [prog]
-    except subprocess.CalledProcessError:
+    else:
         globals()[prog.upper()] = ["magick", prog]
 
 HAVE_IMAGEMAGICK_MODERN = True
 HAVE_EXACT_CMYK8 = True
 try:
     ver = subprocess.check_output(CONVERT + ["-version"], stderr=subprocess.STDOUT)
-    m = re.fullmatch(
-        r"Version: ImageMagick ([0-9.]+-[0-9]+) .*", ver.split(b"\n")[0].decode("utf8")
-    )
+    m = imagemagick_version_re.fullmatch(ver.split(b"\n")[0].decode("utf8"))
     if m is None:
         HAVE_IMAGEMAGICK_MODERN = False
         HAVE_EXACT_CMYK8 = False
@@ -114,12 +132,7 @@ try:
     ver = subprocess.check_output(
         IDENTIFY + ["-list", "format"], stderr=subprocess.STDOUT
     )
-    found = False
-    for line in ver.split(b"\n"):
-        if re.match(rb"\s+JP2\* JP2\s+rw-\s+JPEG-2000 File Format Syntax", line):
-            found = True
-            break
-    if not found:
+    if not any(imagemagick_jp2_re.match(line) for line in ver.split(b"\n")):
         HAVE_JP2 = False
 except FileNotFoundError:
     HAVE_JP2 = False
@@ -140,6 +153,39 @@ psnr_re = re.compile(rb"((?:inf|(?:0|[1-9][0-9]*)(?:\.[0-9]+)?))(?: \([0-9.]+\))
 ###############################################################################
 
 
+# hash a file without reading it into memory as a whole
+def md5sum(path):
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "md5").hexdigest()
+        md5 = hashlib.md5()
+        for chunk in iter(lambda: f.read(0x10000), b""):
+            md5.update(chunk)
+        return md5.hexdigest()
+
+
+# Running ImageMagick is expensive, so the properties of each file are only
+# queried once. The modification time and size are part of the cache key so
+# that a file that was rewritten in the meantime is queried again, even on
+# filesystems with a coarse timestamp resolution.
+@functools.lru_cache(maxsize=None)
+def identify_json_cached(path, frame, mtime_ns, size):
+    if frame is not None:
+        path += "[%d]" % frame
+    return json.loads(subprocess.check_output(CONVERT + [path, "json:"]))
+
+
+def identify_json(path, frame=None):
+    st = os.stat(path)
+    identify = identify_json_cached(str(path), frame, st.st_mtime_ns, st.st_size)
+    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
+    # put into an array, here we cater for the older version containing just
+    # the bare dictionary
+    if "image" in identify:
+        identify = [identify]
+    return identify
+
+
 # Interpret a datetime string in a given timezone and format it according to a
 # given format string in in UTC.
 # We avoid using the Python datetime module for this job because doing so would
@@ -159,75 +205,111 @@ def tz2utcstrftime(string, fmt, timezone):
     )
 
 
-def find_closest_palette_color(color, palette):
-    if color.ndim == 0:
-        idx = (numpy.abs(palette - color)).argmin()
+# the gray palettes are sorted, so the index of the closest color can be
+# found with a binary search over the midpoints between neighbouring palette
+# entries -- a color exactly in the middle maps to the lower entry
+def find_closest_gray(color, midpoints):
+    return bisect.bisect_left(midpoints, color)
+
+
+def find_closest_rgb(color, palette):
+    # naive distance function by computing the euclidean distance in RGB space
+    r, g, b = color
+    closest, mindist = None, float("inf")
+    for i, col in enumerate(palette):
+        dr = col[0] - r
+        dg = col[1] - g
+        db = col[2] - b
+        dist = dr * dr + dg * dg + db * db
+        if dist < mindist:
+            closest, mindist = i, dist
+    return closest
+
+
+# The error diffusion has to visit one pixel after the other, so instead of
+# indexing numpy arrays pixel by pixel, this works on plain Python lists and
+# floats which avoids the numpy overhead for every single operation. To get
+# the same result as when operating on the numpy array directly, values are
+# truncated after every assignment if the input has an integer dtype.
+#
+# With return_indices=True, the index of the chosen palette entry is returned
+# for every pixel instead of its color, so that the result can directly be
+# written as a palette image.
+def floyd_steinberg(img, palette, return_indices=False):
+    height, width = img.shape[0], img.shape[1]
+    result = img.tolist()
+    indices = [[0] * width for _ in range(height)]
+    palette = palette.tolist()
+    if numpy.issubdtype(img.dtype, numpy.integer):
+        conv = int
     else:
-        # naive distance function by computing the euclidean distance in RGB space
-        idx = ((palette - color) ** 2).sum(axis=-1).argmin()
-    return palette[idx]
-
-
-def floyd_steinberg(img, palette):
-    result = numpy.array(img, copy=True)
-    for y in range(result.shape[0]):
-        for x in range(result.shape[1]):
-            oldpixel = result[y, x]
-            newpixel = find_closest_palette_color(oldpixel, palette)
-            quant_error = oldpixel - newpixel
-            result[y, x] = newpixel
-            if x + 1 < result.shape[1]:
-                result[y, x + 1] += quant_error * 7 / 16
-            if y + 1 < result.shape[0]:
-                result[y + 1, x - 1] += quant_error * 3 / 16
-                result[y + 1, x] += quant_error * 5 / 16
-            if x + 1 < result.shape[1] and y + 1 < result.shape[0]:
-                result[y + 1, x + 1] += quant_error * 1 / 16
-    return result
+        conv = float
 
+    # whether pixels are single gray values or lists of RGB values is decided
+    # once here and not for every pixel
+    if img.ndim == 2:
+        midpoints = [(a + b) / 2 for a, b in zip(palette, palette[1:])]
 
-def convolve_rgba(img, kernel):
-    return numpy.stack(
-        (
-            scipy.signal.convolve2d(img[:, :, 0], kernel, "same"),
-            scipy.signal.convolve2d(img[:, :, 1], kernel, "same"),
-            scipy.signal.convolve2d(img[:, :, 2], kernel, "same"),
-            scipy.signal.convolve2d(img[:, :, 3], kernel, "same"),
-        ),
-        axis=-1,
-    )
+        def quantize(oldpixel):
+            i = find_closest_gray(oldpixel, midpoints)
+            newpixel = palette[i]
+            return i, conv(newpixel), oldpixel - newpixel
 
+        def diffuse(row, x, quant_error, factor):
+            row[x] = conv(row[x] + quant_error * factor / 16)
 
-def rgb2gray(img):
-    result = numpy.zeros((60, 60), dtype=numpy.dtype("int64"))
-    count = 0
-    for y in range(img.shape[0]):
-        for x in range(img.shape[1]):
-            clin = sum(img[y, x] * [0.2126, 0.7152, 0.0722]) / 0xFFFF
-            if clin <= 0.0031308:
-                csrgb = 12.92 * clin
-            else:
-                csrgb = 1.055 * clin ** (1 / 2.4) - 0.055
-            result[y, x] = csrgb * 0xFFFF
-            count += 1
-            # if count == 24:
-            #    raise Exception(result[y, x])
-    return result
+    else:
 
+        def quantize(oldpixel):
+            i = find_closest_rgb(oldpixel, palette)
+            newpixel = palette[i]
+            return (
+                i,
+                [conv(v) for v in newpixel],
+                [old - new for old, new in zip(oldpixel, newpixel)],
+            )
 
-def palettize(img, pal):
-    result = numpy.zeros((img.shape[0], img.shape[1]), dtype=numpy.dtype("int64"))
-    for y in range(img.shape[0]):
-        for x in range(img.shape[1]):
-            for i, col in enumerate(pal):
-                if numpy.array_equal(img[y, x], col):
-                    result[y, x] = i
-                    break
-            else:
-                raise Exception()
+        def diffuse(row, x, quant_error, factor):
+            pixel = row[x]
+            for i, err in enumerate(quant_error):
+                pixel[i] = conv(pixel[i] + err * factor / 16)
+
+    for y in range(height):
+        for x in range(width):
+            indices[y][x], result[y][x], quant_error = quantize(result[y][x])
+            if x + 1 < width:
+                diffuse(result[y], x + 1, quant_error, 7)
+            if y + 1 < height:
+                diffuse(result[y + 1], x - 1, quant_error, 3)
+                diffuse(result[y + 1], x, quant_error, 5)
+            if x + 1 < width and y + 1 < height:
+                diffuse(result[y + 1], x + 1, quant_error, 1)
+    if return_indices:
+        return numpy.array(indices, dtype=numpy.dtype("int64"))
+    return numpy.array(result, dtype=img.dtype)
+
+
+def convolve_rgba(img, kernel):
+    result = numpy.empty(img.shape, dtype=numpy.float64)
+    for channel in range(4):
+        result[:, :, channel] = scipy.signal.convolve2d(
+            img[:, :, channel], kernel, "same"
+        )
     return result
 
 
+def rgb2gray(img):
+    # the channels are summed up in the same order as the builtin sum() would
+    # so that the result stays bit-by-bit identical to the per-pixel version
+    clin = (
+        img[:, :, 0] * 0.2126 + img[:, :, 1] * 0.7152 + img[:, :, 2] * 0.0722
+    ) / 0xFFFF
+    csrgb = numpy.where(
+        clin <= 0.0031308, 12.92 * clin, 1.055 * clin ** (1 / 2.4) - 0.055
+    )
+    return (csrgb * 0xFFFF).astype(numpy.dtype("int64"))
+
+
 # we cannot use zlib.compress() because different compressors may compress the
 # same data differently, for example by using different optimizations on
 # different architectures:
@@ -237,6 +319,12 @@ def palettize(img, pal):
 # identical on all platforms we make use of the compression method 0, that is,
 # no compression at all :)
 def compress(data):
+    # maximum chunk size is the largest 16 bit unsigned integer
+    chunksize = 0xFFFF
+    numchunks = (len(data) + chunksize - 1) // chunksize
+    # the output is assembled in place: a two byte zlib header, a five byte
+    # header for every chunk, the data itself and a four byte checksum
+    result = bytearray(2 + 5 * numchunks + len(data) + 4)
     # two-byte zlib header (rfc1950)
     # common header for lowest compression level
     # bits 0-3: Compression info, base-2 logarithm of the LZ77 window size,
@@ -246,31 +334,53 @@ def compress(data):
     # bit 10:   preset dictionary -- 0 is none
     # bits 11-15: check bits so that the 16-bit unsigned integer stored in MSB
     #             order is a multiple of 31
-    result = b"\x78\x01"
+    result[0:2] = b"\x78\x01"
+    pos = 2
     # content is stored in deflate format (rfc1951)
-    # maximum chunk size is the largest 16 bit unsigned integer
-    chunksize = 0xFFFF
+    data = memoryview(data)
     for i in range(0, len(data), chunksize):
         # bits 0-4 are unused
         # bits 5-6 indicate compression method -- 0 is no compression
         # bit 7 indicates the last chunk
-        if i * chunksize < len(data) - chunksize:
-            result += b"\x00"
+        if i + chunksize < len(data):
+            result[pos] = 0x00
         else:
             # last chunck
-            result += b"\x01"
+            result[pos] = 0x01
         chunk = data[i : i + chunksize]
-        # the chunk length as little endian 16 bit unsigned integer
-        result += struct.pack("<H", len(chunk))
-        # the one's complement of the chunk length
+        # the chunk length as little endian 16 bit unsigned integer followed
+        # by the one's complement of the chunk length
         # one's complement is all bits inverted which is the result of
         # xor with 0xffff for a 16 bit unsigned integer
-        result += struct.pack("<H", len(chunk) ^ 0xFFFF)
-        result += chunk
+        struct.pack_into("<HH", result, pos + 1, len(chunk), len(chunk) ^ 0xFFFF)
+        result[pos + 5 : pos + 5 + len(chunk)] = chunk
+        pos += 5 + len(chunk)
     # adler32 checksum of the uncompressed data as big endian 32 bit unsigned
     # integer
-    result += struct.pack(">I", zlib.adler32(data))
-    return result
+    struct.pack_into(">I", result, pos, zlib.adler32(data))
+    return bytes(result)
+
+
+# a PNG chunk consists of the length of its data, the chunk type, the data
+# and a CRC over type and data -- the parts of the data are written out one
+# by one instead of concatenating them first
+def write_png_chunk(f, chunktype, *parts):
+    f.write(struct.pack(">I", sum(len(part) for part in parts)))
+    f.write(chunktype)
+    crc = zlib.crc32(chunktype)
+    for part in parts:
+        f.write(part)
+        crc = zlib.crc32(part, crc)
+    f.write(struct.pack(">I", crc))
+
+
+# the profile is stored with compress() for the same reason as the image data
+# and since the same profile is usually embedded more than once, the result is
+# cached
+@functools.lru_cache(maxsize=4)
+def compressed_icc(path):
+    with open(path, "rb") as f:
+        return compress(f.read())
 
 
 def write_png(data, path, bitdepth, colortype, palette=None, iccp=None):
@@ -282,71 +392,56 @@ def write_png(data, path, bitdepth, colortype, palette=None, iccp=None):
         # Indexed-colour        3           1, 2, 4, 8
         # Greyscale with alpha  4           8, 16
         # Truecolour with alpha 6           8, 16
-        block = b"IHDR" + struct.pack(
-            ">IIBBBBB",
-            data.shape[1],  # width
-            data.shape[0],  # height
-            bitdepth,  # bitdepth
-            colortype,  # colortype
-            0,  # compression
-            0,  # filtertype
-            0,  # interlaced
-        )
-        f.write(
-            struct.pack(">I", len(block) - 4)
-            + block
-            + struct.pack(">I", zlib.crc32(block))
+        write_png_chunk(
+            f,
+            b"IHDR",
+            struct.pack(
+                ">IIBBBBB",
+                data.shape[1],  # width
+                data.shape[0],  # height
+                bitdepth,  # bitdepth
+                colortype,  # colortype
+                0,  # compression
+                0,  # filtertype
+                0,  # interlaced
+            ),
         )
         if iccp is not None:
-            with open(iccp, "rb") as infh:
-                iccdata = infh.read()
-            block = b"iCCP"
-            block += b"icc\0"  # arbitrary profile name
-            block += b"\0"  # compression method (deflate)
-            block += zlib.compress(iccdata)
-            f.write(
-                struct.pack(">I", len(block) - 4)
-                + block
-                + struct.pack(">I", zlib.crc32(block))
+            write_png_chunk(
+                f,
+                b"iCCP",
+                b"icc\0",  # arbitrary profile name
+                b"\0",  # compression method (deflate)
+                compressed_icc(iccp),
             )
         if palette is not None:
-            block = b"PLTE"
-            for col in palette:
-                block += struct.pack(">BBB", col[0], col[1], col[2])
-            f.write(
-                struct.pack(">I", len(block) - 4)
-                + block
-                + struct.pack(">I", zlib.crc32(block))
+            write_png_chunk(
+                f,
+                b"PLTE",
+                b"".join(
+                    struct.pack(">BBB", col[0], col[1], col[2]) for col in palette
+                ),
             )
-        raw = b""
-        for y in range(data.shape[0]):
-            raw += b"\0"
-            if bitdepth == 16:
-                raw += data[y].astype(">u2").tobytes()
-            elif bitdepth == 8:
-                raw += data[y].astype(">u1").tobytes()
-            elif bitdepth in [4, 2, 1]:
-                valsperbyte = 8 // bitdepth
-                for x in range(0, data.shape[1], valsperbyte):
-                    val = 0
-                    for j in range(valsperbyte):
-                        if x + j >= data.shape[1]:
-                            break
-                        val |= (data[y, x + j].astype(">u2") & (2**bitdepth - 1)) << (
-                            (valsperbyte - j - 1) * bitdepth
-                        )
-                    raw += struct.pack(">B", val)
-            else:
-                raise Exception()
-        compressed = compress(raw)
-        block = b"IDAT" + compressed
-        f.write(
-            struct.pack(">I", len(compressed))
-            + block
-            + struct.pack(">I", zlib.crc32(block))
-        )
-        block = b"IEND"
-        f.write(struct.pack(">I", 0) + block + struct.pack(">I", zlib.crc32(block)))
+        if bitdepth == 16:
+            rows = data.astype(">u2")
+        elif bitdepth == 8:
+            rows = data.astype(">u1")
+        elif bitdepth in [4, 2, 1]:
+            valsperbyte = 8 // bitdepth
+            vals = data.astype(">u2") & (2**bitdepth - 1)
+            # pad the rows with zeros to fill up the last byte
+            padding = -data.shape[1] % valsperbyte
+            vals = numpy.pad(vals, ((0, 0), (0, padding)))
+            # group the values of each byte together and shift them into place
+            vals = vals.reshape(data.shape[0], -1, valsperbyte)
+            shifts = numpy.arange(valsperbyte - 1, -1, -1) * bitdepth
+            rows = (vals << shifts).sum(axis=-1).astype(">u1")
+        else:
+            raise Exception()
+        # every scanline starts with the filter type byte (0 is none)
+        raw = b"".join(b"\0" + row.tobytes() for row in rows)
+        write_png_chunk(f, b"IDAT", compress(raw))
+        write_png_chunk(f, b"IEND")
 
 
 def compare(im1, im2, exact, icc, cmyk):
@@ -389,9 +484,9 @@ def compare(im1, im2, exact, icc, cmyk):
         ).stderr
         assert psnr != b"0"
         assert psnr != b"0 (0)"
-        assert psnr_re.fullmatch(psnr) is not None, psnr
-        psnr = psnr_re.fullmatch(psnr).group(1)
-        psnr = float(psnr)
+        m = psnr_re.fullmatch(psnr)
+        assert m is not None, psnr
+        psnr = float(m.group(1))
         assert psnr != 0  # or otherwise we would use the exact variant
         assert psnr > 50
 
@@ -548,8 +643,9 @@ def compare_pdfimages_png(tmpdir, img, pdf, exact=True, icc=False):
             ).stderr
         assert psnr != b"0"
         assert psnr != b"0 (0)"
-        psnr = psnr_re.fullmatch(psnr).group(1)
-        psnr = float(psnr)
+        m = psnr_re.fullmatch(psnr)
+        assert m is not None, psnr
+        psnr = float(m.group(1))
         assert psnr != 0  # or otherwise we would use the exact variant
         assert psnr > 50
     (tmpdir / "images-000.png").unlink()
@@ -581,33 +677,42 @@ def tiff_header_for_ccitt(width, height, img_size, ccitt_group=4):
     )
 
 
-pixel_R = [
-    [1, 1, 1, 0],
-    [1, 0, 0, 1],
-    [1, 0, 0, 1],
-    [1, 1, 1, 0],
-    [1, 0, 0, 1],
-    [1, 0, 0, 1],
-    [1, 0, 0, 1],
-]
-pixel_G = [
-    [0, 1, 1, 0],
-    [1, 0, 0, 1],
-    [1, 0, 0, 0],
-    [1, 0, 1, 1],
-    [1, 0, 0, 1],
-    [1, 0, 0, 1],
-    [0, 1, 1, 0],
-]
-pixel_B = [
-    [1, 1, 1, 0],
-    [1, 0, 0, 1],
-    [1, 0, 0, 1],
-    [1, 1, 1, 0],
-    [1, 0, 0, 1],
-    [1, 0, 0, 1],
-    [1, 1, 1, 0],
-]
+pixel_R = numpy.array(
+    [
+        [1, 1, 1, 0],
+        [1, 0, 0, 1],
+        [1, 0, 0, 1],
+        [1, 1, 1, 0],
+        [1, 0, 0, 1],
+        [1, 0, 0, 1],
+        [1, 0, 0, 1],
+    ],
+    dtype=bool,
+)
+pixel_G = numpy.array(
+    [
+        [0, 1, 1, 0],
+        [1, 0, 0, 1],
+        [1, 0, 0, 0],
+        [1, 0, 1, 1],
+        [1, 0, 0, 1],
+        [1, 0, 0, 1],
+        [0, 1, 1, 0],
+    ],
+    dtype=bool,
+)
+pixel_B = numpy.array(
+    [
+        [1, 1, 1, 0],
+        [1, 0, 0, 1],
+        [1, 0, 0, 1],
+        [1, 1, 1, 0],
+        [1, 0, 0, 1],
+        [1, 0, 0, 1],
+        [1, 1, 1, 0],
+    ],
+    dtype=bool,
+)
 
 
 def alpha_value():
@@ -631,34 +736,25 @@ def alpha_value():
     for offs in offsets_36 + offsets_36[::-1]:
         circle.append([0] * offs + [1] * (len(offsets_36) - offs) * 2 + [0] * offs)
 
+    circle = numpy.array(circle, dtype=bool)
+
     alpha = numpy.zeros((60, 60, 4), dtype=numpy.dtype("int64"))
 
     # draw three circles
+    # the rows of the circle array are the columns of the image
     for xpos, ypos, color in [
         (12, 3, [0xFFFF, 0, 0, 0xFFFF]),
         (21, 21, [0, 0xFFFF, 0, 0xFFFF]),
         (3, 21, [0, 0, 0xFFFF, 0xFFFF]),
     ]:
-        for x, row in enumerate(circle):
-            for y, pos in enumerate(row):
-                if pos:
-                    alpha[y + ypos, x + xpos] += color
+        alpha[ypos : ypos + 36, xpos : xpos + 36][circle.T] += color
     alpha = numpy.clip(alpha, 0, 0xFFFF)
     alpha = convolve_rgba(alpha, kernel)
 
     # draw letters
-    for y, row in enumerate(pixel_R):
-        for x, pos in enumerate(row):
-            if pos:
-                alpha[13 + y, 28 + x] = [0xFFFF, 0xFFFF, 0xFFFF, 0xFFFF]
-    for y, row in enumerate(pixel_G):
-        for x, pos in enumerate(row):
-            if pos:
-                alpha[39 + y, 40 + x] = [0xFFFF, 0xFFFF, 0xFFFF, 0xFFFF]
-    for y, row in enumerate(pixel_B):
-        for x, pos in enumerate(row):
-            if pos:
-                alpha[39 + y, 15 + x] = [0xFFFF, 0xFFFF, 0xFFFF, 0xFFFF]
+    for ypos, xpos, letter in [(13, 28, pixel_R), (39, 40, pixel_G), (39, 15, pixel_B)]:
+        height, width = letter.shape
+        alpha[ypos : ypos + height, xpos : xpos + width][letter] = 0xFFFF
     return alpha
 
 
@@ -672,25 +768,26 @@ def icc_profile():
 
     getxyz = lambda v: (round(65536 * v[0]), round(65536 * v[1]), round(65536 * v[2]))
 
-    header = (
-        # header
-        +4 * b"\0"  # cmmsignatures
-        + 4 * b"\0"  # version
-        + b"mntr"  # device class
-        + b"RGB "  # color space
-        + b"XYZ "  # PCS
-        + 12 * b"\0"  # datetime
-        + b"\x61\x63\x73\x70"  # static signature
-        + 4 * b"\0"  # platform
-        + 4 * b"\0"  # flags
-        + 4 * b"\0"  # device manufacturer
-        + 4 * b"\0"  # device model
-        + 8 * b"\0"  # device attributes
-        + 4 * b"\0"  # rendering intents
-        + struct.pack(">III", *getxyz(PCS))
-        + 4 * b"\0"  # creator
-        + 16 * b"\0"  # identifier
-        + 28 * b"\0"  # reserved
+    header = b"".join(
+        [
+            4 * b"\0",  # cmmsignatures
+            4 * b"\0",  # version
+            b"mntr",  # device class
+            b"RGB ",  # color space
+            b"XYZ ",  # PCS
+            12 * b"\0",  # datetime
+            b"\x61\x63\x73\x70",  # static signature
+            4 * b"\0",  # platform
+            4 * b"\0",  # flags
+            4 * b"\0",  # device manufacturer
+            4 * b"\0",  # device model
+            8 * b"\0",  # device attributes
+            4 * b"\0",  # rendering intents
+            struct.pack(">III", *getxyz(PCS)),
+            4 * b"\0",  # creator
+            16 * b"\0",  # identifier
+            28 * b"\0",  # reserved
+        ]
     )
 
     def pad4(s):
@@ -739,15 +836,15 @@ def icc_profile():
 
     data = b"".join([pad4(s) for s in tagdata])
 
-    data = (
-        struct.pack(">I", 4 + len(header) + len(table) + len(data))
-        + header
-        + table
-        + data
+    return b"".join(
+        [
+            struct.pack(">I", 4 + len(header) + len(table) + len(data)),
+            header,
+            table,
+            data,
+        ]
     )
 
-    return data
-
 
 ###############################################################################
 #                                 INPUT FIXTURES                              #
@@ -759,22 +856,27 @@ def alpha():
     return alpha_value()
 
 
+@pytest.fixture(scope="session")
+def normal16(alpha):
+    return numpy.ascontiguousarray(alpha[:, :, 0:3])
+
+
+@pytest.fixture(scope="session")
+def gray16(normal16):
+    return rgb2gray(normal16)
+
+
 @pytest.fixture(scope="session")
 def tmp_alpha_png(tmp_path_factory, alpha):
     tmp_alpha_png = tmp_path_factory.mktemp("alpha_png") / "alpha.png"
     write_png(alpha, str(tmp_alpha_png), 16, 6)
-    assert (
-        hashlib.md5(tmp_alpha_png.read_bytes()).hexdigest()
-        == "600bb4cffb039a022cec6ed55537deba"
-    )
+    assert md5sum(tmp_alpha_png) == "600bb4cffb039a022cec6ed55537deba"
     yield tmp_alpha_png
     tmp_alpha_png.unlink()
 
 
 @pytest.fixture(scope="session")
-def tmp_gray1_png(tmp_path_factory, alpha):
-    normal16 = alpha[:, :, 0:3]
-    gray16 = rgb2gray(normal16)
+def tmp_gray1_png(tmp_path_factory, gray16):
     tmp_gray1_png = tmp_path_factory.mktemp("gray1_png") / "gray1.png"
     write_png(
         floyd_steinberg(gray16, numpy.arange(2) / 0x1 * 0xFFFF) / 0xFFFF * 0x1,
@@ -782,18 +884,13 @@ def tmp_gray1_png(tmp_path_factory, alpha):
         1,
         0,
     )
-    assert (
-        hashlib.md5(tmp_gray1_png.read_bytes()).hexdigest()
-        == "dd2c528152d34324747355b73495a115"
-    )
+    assert md5sum(tmp_gray1_png) == "dd2c528152d34324747355b73495a115"
     yield tmp_gray1_png
     tmp_gray1_png.unlink()
 
 
 @pytest.fixture(scope="session")
-def tmp_gray2_png(tmp_path_factory, alpha):
-    normal16 = alpha[:, :, 0:3]
-    gray16 = rgb2gray(normal16)
+def tmp_gray2_png(tmp_path_factory, gray16):
     tmp_gray2_png = tmp_path_factory.mktemp("gray2_png") / "gray2.png"
     write_png(
         floyd_steinberg(gray16, numpy.arange(4) / 0x3 * 0xFFFF) / 0xFFFF * 0x3,
@@ -801,18 +898,13 @@ def tmp_gray2_png(tmp_path_factory, alpha):
         2,
         0,
     )
-    assert (
-        hashlib.md5(tmp_gray2_png.read_bytes()).hexdigest()
-        == "68e614f4e6a85053d47098dad0ca3976"
-    )
+    assert md5sum(tmp_gray2_png) == "68e614f4e6a85053d47098dad0ca3976"
     yield tmp_gray2_png
     tmp_gray2_png.unlink()
 
 
 @pytest.fixture(scope="session")
-def tmp_gray4_png(tmp_path_factory, alpha):
-    normal16 = alpha[:, :, 0:3]
-    gray16 = rgb2gray(normal16)
+def tmp_gray4_png(tmp_path_factory, gray16):
     tmp_gray4_png = tmp_path_factory.mktemp("gray4_png") / "gray4.png"
     write_png(
         floyd_steinberg(gray16, numpy.arange(16) / 0xF * 0xFFFF) / 0xFFFF * 0xF,
@@ -820,51 +912,34 @@ def tmp_gray4_png(tmp_path_factory, alpha):
         4,
         0,
     )
-    assert (
-        hashlib.md5(tmp_gray4_png.read_bytes()).hexdigest()
-        == "ff04a6fea88133eb77bbb748692ae0fd"
-    )
+    assert md5sum(tmp_gray4_png) == "ff04a6fea88133eb77bbb748692ae0fd"
     yield tmp_gray4_png
     tmp_gray4_png.unlink()
 
 
 @pytest.fixture(scope="session")
-def tmp_gray8_png(tmp_path_factory, alpha):
-    normal16 = alpha[:, :, 0:3]
-    gray16 = rgb2gray(normal16)
+def tmp_gray8_png(tmp_path_factory, gray16):
     tmp_gray8_png = tmp_path_factory.mktemp("gray8_png") / "gray8.png"
     write_png(gray16 / 0xFFFF * 0xFF, tmp_gray8_png, 8, 0)
-    assert (
-        hashlib.md5(tmp_gray8_png.read_bytes()).hexdigest()
-        == "90b4ed9123f295dda7fde499744dede7"
-    )
+    assert md5sum(tmp_gray8_png) == "90b4ed9123f295dda7fde499744dede7"
     yield tmp_gray8_png
     tmp_gray8_png.unlink()
 
 
 @pytest.fixture(scope="session")
-def tmp_gray16_png(tmp_path_factory, alpha):
-    normal16 = alpha[:, :, 0:3]
-    gray16 = rgb2gray(normal16)
+def tmp_gray16_png(tmp_path_factory, gray16):
     tmp_gray16_png = tmp_path_factory.mktemp("gray16_png") / "gray16.png"
     write_png(gray16, str(tmp_gray16_png), 16, 0)
-    assert (
-        hashlib.md5(tmp_gray16_png.read_bytes()).hexdigest()
-        == "f76153d2e72fada11d934c32c8168a57"
-    )
+    assert md5sum(tmp_gray16_png) == "f76153d2e72fada11d934c32c8168a57"
     yield tmp_gray16_png
     tmp_gray16_png.unlink()
 
 
 @pytest.fixture(scope="session")
-def tmp_inverse_png(tmp_path_factory, alpha):
-    normal16 = alpha[:, :, 0:3]
+def tmp_inverse_png(tmp_path_factory, normal16):
     tmp_inverse_png = tmp_path_factory.mktemp("inverse_png") / "inverse.png"
     write_png(0xFF - normal16 / 0xFFFF * 0xFF, str(tmp_inverse_png), 8, 2)
-    assert (
-        hashlib.md5(tmp_inverse_png.read_bytes()).hexdigest()
-        == "0a7d57dc09c4d8fd1ad3511b116c7dfa"
-    )
+    assert md5sum(tmp_inverse_png) == "0a7d57dc09c4d8fd1ad3511b116c7dfa"
     yield tmp_inverse_png
     tmp_inverse_png.unlink()
 
@@ -878,8 +953,7 @@ def tmp_icc_profile(tmp_path_factory):
 
 
 @pytest.fixture(scope="session")
-def tmp_icc_png(tmp_path_factory, alpha, tmp_icc_profile):
-    normal16 = alpha[:, :, 0:3]
+def tmp_icc_png(tmp_path_factory, normal16, tmp_icc_profile):
     tmp_icc_png = tmp_path_factory.mktemp("icc_png") / "icc.png"
     write_png(
         normal16 / 0xFFFF * 0xFF,
@@ -888,43 +962,31 @@ def tmp_icc_png(tmp_path_factory, alpha, tmp_icc_profile):
         2,
         iccp=str(tmp_icc_profile),
     )
-    assert (
-        hashlib.md5(tmp_icc_png.read_bytes()).hexdigest()
-        == "bf25f673c1617f5f9353b2a043747655"
-    )
+    assert md5sum(tmp_icc_png) == "64e8e43c8e8c2658602feb83ce90831c"
     yield tmp_icc_png
     tmp_icc_png.unlink()
 
 
 @pytest.fixture(scope="session")
-def tmp_normal16_png(tmp_path_factory, alpha):
-    normal16 = alpha[:, :, 0:3]
+def tmp_normal16_png(tmp_path_factory, normal16):
     tmp_normal16_png = tmp_path_factory.mktemp("normal16_png") / "normal16.png"
     write_png(normal16, str(tmp_normal16_png), 16, 2)
-    assert (
-        hashlib.md5(tmp_normal16_png.read_bytes()).hexdigest()
-        == "820dd30a2566775fc64c110e8ac65c7e"
-    )
+    assert md5sum(tmp_normal16_png) == "820dd30a2566775fc64c110e8ac65c7e"
     yield tmp_normal16_png
     tmp_normal16_png.unlink()
 
 
 @pytest.fixture(scope="session")
-def tmp_normal_png(tmp_path_factory, alpha):
-    normal16 = alpha[:, :, 0:3]
+def tmp_normal_png(tmp_path_factory, normal16):
     tmp_normal_png = tmp_path_factory.mktemp("normal_png") / "normal.png"
     write_png(normal16 / 0xFFFF * 0xFF, str(tmp_normal_png), 8, 2)
-    assert (
-        hashlib.md5(tmp_normal_png.read_bytes()).hexdigest()
-        == "bc30c705f455991cd04be1c298063002"
-    )
+    assert md5sum(tmp_normal_png) == "bc30c705f455991cd04be1c298063002"
     yield tmp_normal_png
     tmp_normal_png.unlink()
 
 
 @pytest.fixture(scope="session")
-def tmp_palette1_png(tmp_path_factory, alpha):
-    normal16 = alpha[:, :, 0:3]
+def tmp_palette1_png(tmp_path_factory, normal16):
     tmp_palette1_png = tmp_path_factory.mktemp("palette1_png") / "palette1.png"
     # don't choose black and white or otherwise imagemagick will classify the
     # image as bilevel with 8/1-bit depth instead of palette with 8-bit color
@@ -934,25 +996,19 @@ def tmp_palette1_png(tmp_path_factory, alpha):
         [[0x01, 0x02, 0x03], [0xFE, 0xFD, 0xFC]], dtype=numpy.dtype("int64")
     )
     write_png(
-        palettize(
-            floyd_steinberg(normal16, pal1 * 0xFFFF / 0xFF) / 0xFFFF * 0xFF, pal1
-        ),
+        floyd_steinberg(normal16, pal1 * 0xFFFF / 0xFF, return_indices=True),
         str(tmp_palette1_png),
         1,
         3,
         pal1,
     )
-    assert (
-        hashlib.md5(tmp_palette1_png.read_bytes()).hexdigest()
-        == "3d065f731540e928fb730b3233e4e8a7"
-    )
+    assert md5sum(tmp_palette1_png) == "3d065f731540e928fb730b3233e4e8a7"
     yield tmp_palette1_png
     tmp_palette1_png.unlink()
 
 
 @pytest.fixture(scope="session")
-def tmp_palette2_png(tmp_path_factory, alpha):
-    normal16 = alpha[:, :, 0:3]
+def tmp_palette2_png(tmp_path_factory, normal16):
     tmp_palette2_png = tmp_path_factory.mktemp("palette2_png") / "palette2.png"
     # choose values slightly off red, lime and blue because otherwise
     # imagemagick will classify the image as Depth: 8/1-bit
@@ -961,25 +1017,19 @@ def tmp_palette2_png(tmp_path_factory, alpha):
         dtype=numpy.dtype("int64"),
     )
     write_png(
-        palettize(
-            floyd_steinberg(normal16, pal2 * 0xFFFF / 0xFF) / 0xFFFF * 0xFF, pal2
-        ),
+        floyd_steinberg(normal16, pal2 * 0xFFFF / 0xFF, return_indices=True),
         str(tmp_palette2_png),
         2,
         3,
         pal2,
     )
-    assert (
-        hashlib.md5(tmp_palette2_png.read_bytes()).hexdigest()
-        == "0b0d4412c28da26163a622d218ee02ca"
-    )
+    assert md5sum(tmp_palette2_png) == "0b0d4412c28da26163a622d218ee02ca"
     yield tmp_palette2_png
     tmp_palette2_png.unlink()
 
 
 @pytest.fixture(scope="session")
-def tmp_palette4_png(tmp_path_factory, alpha):
-    normal16 = alpha[:, :, 0:3]
+def tmp_palette4_png(tmp_path_factory, normal16):
     tmp_palette4_png = tmp_path_factory.mktemp("palette4_png") / "palette4.png"
     # windows 16 color palette
     pal4 = numpy.array(
@@ -1004,53 +1054,43 @@ def tmp_palette4_png(tmp_path_factory, alpha):
         dtype=numpy.dtype("int64"),
     )
     write_png(
-        palettize(
-            floyd_steinberg(normal16, pal4 * 0xFFFF / 0xFF) / 0xFFFF * 0xFF, pal4
-        ),
+        floyd_steinberg(normal16, pal4 * 0xFFFF / 0xFF, return_indices=True),
         str(tmp_palette4_png),
         4,
         3,
         pal4,
     )
-    assert (
-        hashlib.md5(tmp_palette4_png.read_bytes()).hexdigest()
-        == "163f6d7964b80eefa0dc6a48cb7315dd"
-    )
+    assert md5sum(tmp_palette4_png) == "163f6d7964b80eefa0dc6a48cb7315dd"
     yield tmp_palette4_png
     tmp_palette4_png.unlink()
 
 
 @pytest.fixture(scope="session")
-def tmp_palette8_png(tmp_path_factory, alpha):
-    normal16 = alpha[:, :, 0:3]
+def tmp_palette8_png(tmp_path_factory, normal16):
     tmp_palette8_png = tmp_path_factory.mktemp("palette8_png") / "palette8.png"
     # create a 256 color palette by first writing 16 shades of gray
     # and then writing an array of RGB colors with 6, 8 and 5 levels
     # for red, green and blue, respectively
-    pal8 = numpy.zeros((256, 3), dtype=numpy.dtype("int64"))
-    i = 0
-    for gray in range(15, 255, 15):
-        pal8[i] = [gray, gray, gray]
-        i += 1
-    for red in 0, 0x33, 0x66, 0x99, 0xCC, 0xFF:
-        for green in 0, 0x24, 0x49, 0x6D, 0x92, 0xB6, 0xDB, 0xFF:
-            for blue in 0, 0x40, 0x80, 0xBF, 0xFF:
-                pal8[i] = [red, green, blue]
-                i += 1
-    assert i == 256
-    write_png(
-        palettize(
-            floyd_steinberg(normal16, pal8 * 0xFFFF / 0xFF) / 0xFFFF * 0xFF, pal8
+    grays = numpy.repeat(numpy.arange(15, 255, 15)[:, None], 3, axis=1)
+    cube = numpy.stack(
+        numpy.meshgrid(
+            [0, 0x33, 0x66, 0x99, 0xCC, 0xFF],
+            [0, 0x24, 0x49, 0x6D, 0x92, 0xB6, 0xDB, 0xFF],
+            [0, 0x40, 0x80, 0xBF, 0xFF],
+            indexing="ij",
         ),
+        axis=-1,
+    ).reshape(-1, 3)
+    pal8 = numpy.concatenate([grays, cube]).astype(numpy.dtype("int64"))
+    assert pal8.shape == (256, 3)
+    write_png(
+        floyd_steinberg(normal16, pal8 * 0xFFFF / 0xFF, return_indices=True),
         str(tmp_palette8_png),
         8,
         3,
         pal8,
     )
-    assert (
-        hashlib.md5(tmp_palette8_png.read_bytes()).hexdigest()
-        == "8847bb734eba0e2d85e3f97fc2849dd4"
-    )
+    assert md5sum(tmp_palette8_png) == "8847bb734eba0e2d85e3f97fc2849dd4"
     yield tmp_palette8_png
     tmp_palette8_png.unlink()
 
@@ -1059,13 +1099,8 @@ def tmp_palette8_png(tmp_path_factory, alpha):
 def jpg_img(tmp_path_factory, tmp_normal_png):
     in_img = tmp_path_factory.mktemp("jpg") / "in.jpg"
     subprocess.check_call(CONVERT + [str(tmp_normal_png), str(in_img)])
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "JPEG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/jpeg", str(identify)
@@ -1115,13 +1150,8 @@ def jpg_rot_img(tmp_path_factory, tmp_normal_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "JPEG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/jpeg", str(identify)
@@ -1154,13 +1184,8 @@ def jpg_cmyk_img(tmp_path_factory, tmp_normal_png):
     subprocess.check_call(
         CONVERT + [str(tmp_normal_png), "-colorspace", "cmyk", str(in_img)]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "JPEG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/jpeg", str(identify)
@@ -1188,13 +1213,8 @@ def jpg_cmyk_img(tmp_path_factory, tmp_normal_png):
 def jpg_2000_img(tmp_path_factory, tmp_normal_png):
     in_img = tmp_path_factory.mktemp("jpg_2000") / "in.jp2"
     subprocess.check_call(CONVERT + [str(tmp_normal_png), str(in_img)])
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "JP2", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/jp2", str(identify)
@@ -1222,13 +1242,8 @@ def jpg_2000_img(tmp_path_factory, tmp_normal_png):
 def jpg_2000_rgba8_img(tmp_path_factory, tmp_alpha_png):
     in_img = tmp_path_factory.mktemp("jpg_2000_rgba8") / "in.jp2"
     subprocess.check_call(CONVERT + [str(tmp_alpha_png), "-depth", "8", str(in_img)])
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "JP2", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/jp2", str(identify)
@@ -1256,13 +1271,8 @@ def jpg_2000_rgba8_img(tmp_path_factory, tmp_alpha_png):
 def jpg_2000_rgba16_img(tmp_path_factory, tmp_alpha_png):
     in_img = tmp_path_factory.mktemp("jpg_2000_rgba16") / "in.jp2"
     subprocess.check_call(CONVERT + [str(tmp_alpha_png), str(in_img)])
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "JP2", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/jp2", str(identify)
@@ -1289,13 +1299,8 @@ def jpg_2000_rgba16_img(tmp_path_factory, tmp_alpha_png):
 @pytest.fixture(scope="session")
 def png_rgb8_img(tmp_normal_png):
     in_img = tmp_normal_png
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -1338,13 +1343,8 @@ def png_rgb8_img(tmp_normal_png):
 @pytest.fixture(scope="session")
 def png_rgb16_img(tmp_normal16_png):
     in_img = tmp_normal16_png
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -1391,13 +1391,8 @@ def png_rgba8_img(tmp_path_factory, tmp_alpha_png):
     subprocess.check_call(
         CONVERT + [str(tmp_alpha_png), "-depth", "8", "-strip", str(in_img)]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -1441,13 +1436,8 @@ def png_rgba8_img(tmp_path_factory, tmp_alpha_png):
 @pytest.fixture(scope="session")
 def png_rgba16_img(tmp_alpha_png):
     in_img = tmp_alpha_png
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -1507,13 +1497,8 @@ def png_gray8a_img(tmp_path_factory, tmp_alpha_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -1569,13 +1554,8 @@ def png_gray16a_img(tmp_path_factory, tmp_alpha_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -1630,13 +1610,8 @@ def png_interlaced_img(tmp_path_factory, tmp_normal_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -1679,15 +1654,8 @@ def png_interlaced_img(tmp_path_factory, tmp_normal_png):
 
 @pytest.fixture(scope="session")
 def png_gray1_img(tmp_path_factory, tmp_gray1_png):
-    identify = json.loads(
-        subprocess.check_output(CONVERT + [str(tmp_gray1_png), "json:"])
-    )
+    identify = identify_json(tmp_gray1_png)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -1729,15 +1697,8 @@ def png_gray1_img(tmp_path_factory, tmp_gray1_png):
 
 @pytest.fixture(scope="session")
 def png_gray2_img(tmp_path_factory, tmp_gray2_png):
-    identify = json.loads(
-        subprocess.check_output(CONVERT + [str(tmp_gray2_png), "json:"])
-    )
+    identify = identify_json(tmp_gray2_png)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -1779,15 +1740,8 @@ def png_gray2_img(tmp_path_factory, tmp_gray2_png):
 
 @pytest.fixture(scope="session")
 def png_gray4_img(tmp_path_factory, tmp_gray4_png):
-    identify = json.loads(
-        subprocess.check_output(CONVERT + [str(tmp_gray4_png), "json:"])
-    )
+    identify = identify_json(tmp_gray4_png)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -1829,15 +1783,8 @@ def png_gray4_img(tmp_path_factory, tmp_gray4_png):
 
 @pytest.fixture(scope="session")
 def png_gray8_img(tmp_path_factory, tmp_gray8_png):
-    identify = json.loads(
-        subprocess.check_output(CONVERT + [str(tmp_gray8_png), "json:"])
-    )
+    identify = identify_json(tmp_gray8_png)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -1879,15 +1826,8 @@ def png_gray8_img(tmp_path_factory, tmp_gray8_png):
 
 @pytest.fixture(scope="session")
 def png_gray16_img(tmp_path_factory, tmp_gray16_png):
-    identify = json.loads(
-        subprocess.check_output(CONVERT + [str(tmp_gray16_png), "json:"])
-    )
+    identify = identify_json(tmp_gray16_png)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -1930,15 +1870,8 @@ def png_gray16_img(tmp_path_factory, tmp_gray16_png):
 
 @pytest.fixture(scope="session")
 def png_palette1_img(tmp_path_factory, tmp_palette1_png):
-    identify = json.loads(
-        subprocess.check_output(CONVERT + [str(tmp_palette1_png), "json:"])
-    )
+    identify = identify_json(tmp_palette1_png)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -1980,15 +1913,8 @@ def png_palette1_img(tmp_path_factory, tmp_palette1_png):
 
 @pytest.fixture(scope="session")
 def png_palette2_img(tmp_path_factory, tmp_palette2_png):
-    identify = json.loads(
-        subprocess.check_output(CONVERT + [str(tmp_palette2_png), "json:"])
-    )
+    identify = identify_json(tmp_palette2_png)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -2030,15 +1956,8 @@ def png_palette2_img(tmp_path_factory, tmp_palette2_png):
 
 @pytest.fixture(scope="session")
 def png_palette4_img(tmp_path_factory, tmp_palette4_png):
-    identify = json.loads(
-        subprocess.check_output(CONVERT + [str(tmp_palette4_png), "json:"])
-    )
+    identify = identify_json(tmp_palette4_png)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -2080,15 +1999,8 @@ def png_palette4_img(tmp_path_factory, tmp_palette4_png):
 
 @pytest.fixture(scope="session")
 def png_palette8_img(tmp_path_factory, tmp_palette8_png):
-    identify = json.loads(
-        subprocess.check_output(CONVERT + [str(tmp_palette8_png), "json:"])
-    )
+    identify = identify_json(tmp_palette8_png)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -2132,13 +2044,8 @@ def png_palette8_img(tmp_path_factory, tmp_palette8_png):
 def gif_transparent_img(tmp_path_factory, tmp_alpha_png):
     in_img = tmp_path_factory.mktemp("gif_transparent_img") / "in.gif"
     subprocess.check_call(CONVERT + [str(tmp_alpha_png), str(in_img)])
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "GIF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/gif", str(identify)
@@ -2167,13 +2074,8 @@ def gif_transparent_img(tmp_path_factory, tmp_alpha_png):
 def gif_palette1_img(tmp_path_factory, tmp_palette1_png):
     in_img = tmp_path_factory.mktemp("gif_palette1_img") / "in.gif"
     subprocess.check_call(CONVERT + [str(tmp_palette1_png), str(in_img)])
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "GIF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/gif", str(identify)
@@ -2202,13 +2104,8 @@ def gif_palette1_img(tmp_path_factory, tmp_palette1_png):
 def gif_palette2_img(tmp_path_factory, tmp_palette2_png):
     in_img = tmp_path_factory.mktemp("gif_palette2_img") / "in.gif"
     subprocess.check_call(CONVERT + [str(tmp_palette2_png), str(in_img)])
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "GIF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/gif", str(identify)
@@ -2237,13 +2134,8 @@ def gif_palette2_img(tmp_path_factory, tmp_palette2_png):
 def gif_palette4_img(tmp_path_factory, tmp_palette4_png):
     in_img = tmp_path_factory.mktemp("gif_palette4_img") / "in.gif"
     subprocess.check_call(CONVERT + [str(tmp_palette4_png), str(in_img)])
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "GIF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/gif", str(identify)
@@ -2272,13 +2164,8 @@ def gif_palette4_img(tmp_path_factory, tmp_palette4_png):
 def gif_palette8_img(tmp_path_factory, tmp_palette8_png):
     in_img = tmp_path_factory.mktemp("gif_palette8_img") / "in.gif"
     subprocess.check_call(CONVERT + [str(tmp_palette8_png), str(in_img)])
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "GIF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/gif", str(identify)
@@ -2331,15 +2218,8 @@ def gif_animation_img(tmp_path_factory, tmp_normal_png, tmp_inverse_png):
     )
     pal_img.unlink()
     tmp_img.unlink()
-    identify = json.loads(
-        subprocess.check_output(CONVERT + [str(in_img) + "[0]", "json:"])
-    )
+    identify = identify_json(in_img, frame=0)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "GIF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/gif", str(identify)
@@ -2361,15 +2241,8 @@ def gif_animation_img(tmp_path_factory, tmp_normal_png, tmp_inverse_png):
     }, str(identify)
     assert identify[0]["image"].get("compression") == "LZW", str(identify)
     colormap_frame0 = identify[0]["image"].get("colormap")
-    identify = json.loads(
-        subprocess.check_output(CONVERT + [str(in_img) + "[1]", "json:"])
-    )
+    identify = identify_json(in_img, frame=1)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "GIF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/gif", str(identify)
@@ -2411,13 +2284,8 @@ def tiff_float_img(tmp_path_factory, tmp_normal_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -2465,13 +2333,8 @@ def tiff_cmyk8_img(tmp_path_factory, tmp_normal_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -2517,13 +2380,8 @@ def tiff_cmyk16_img(tmp_path_factory, tmp_normal_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -2559,13 +2417,8 @@ def tiff_rgb8_img(tmp_path_factory, tmp_normal_png):
     subprocess.check_call(
         CONVERT + [str(tmp_normal_png), "-compress", "Zip", str(in_img)]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -2608,13 +2461,8 @@ def tiff_rgb12_img(tmp_path_factory, tmp_normal16_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -2657,13 +2505,8 @@ def tiff_rgb14_img(tmp_path_factory, tmp_normal16_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -2706,13 +2549,8 @@ def tiff_rgb16_img(tmp_path_factory, tmp_normal16_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -2756,13 +2594,8 @@ def tiff_rgba8_img(tmp_path_factory, tmp_alpha_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -2806,13 +2639,8 @@ def tiff_rgba16_img(tmp_path_factory, tmp_alpha_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -2855,13 +2683,8 @@ def tiff_gray1_img(tmp_path_factory, tmp_gray1_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -2905,13 +2728,8 @@ def tiff_gray2_img(tmp_path_factory, tmp_gray2_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -2955,13 +2773,8 @@ def tiff_gray4_img(tmp_path_factory, tmp_gray4_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3005,13 +2818,8 @@ def tiff_gray8_img(tmp_path_factory, tmp_gray8_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3055,13 +2863,8 @@ def tiff_gray16_img(tmp_path_factory, tmp_gray16_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3105,15 +2908,8 @@ def tiff_multipage_img(tmp_path_factory, tmp_normal_png, tmp_inverse_png):
             str(in_img),
         ]
     )
-    identify = json.loads(
-        subprocess.check_output(CONVERT + [str(in_img) + "[0]", "json:"])
-    )
+    identify = identify_json(in_img, frame=0)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3138,15 +2934,8 @@ def tiff_multipage_img(tmp_path_factory, tmp_normal_png, tmp_inverse_png):
     assert (
         identify[0]["image"].get("properties", {}).get("tiff:photometric") == "RGB"
     ), str(identify)
-    identify = json.loads(
-        subprocess.check_output(CONVERT + [str(in_img) + "[1]", "json:"])
-    )
+    identify = identify_json(in_img, frame=1)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3182,13 +2971,8 @@ def tiff_palette1_img(tmp_path_factory, tmp_palette1_png):
     subprocess.check_call(
         CONVERT + [str(tmp_palette1_png), "-compress", "Zip", str(in_img)]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3225,13 +3009,8 @@ def tiff_palette2_img(tmp_path_factory, tmp_palette2_png):
     subprocess.check_call(
         CONVERT + [str(tmp_palette2_png), "-compress", "Zip", str(in_img)]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3268,13 +3047,8 @@ def tiff_palette4_img(tmp_path_factory, tmp_palette4_png):
     subprocess.check_call(
         CONVERT + [str(tmp_palette4_png), "-compress", "Zip", str(in_img)]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3311,13 +3085,8 @@ def tiff_palette8_img(tmp_path_factory, tmp_palette8_png):
     subprocess.check_call(
         CONVERT + [str(tmp_palette8_png), "-compress", "Zip", str(in_img)]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3367,13 +3136,8 @@ def tiff_ccitt_lsb_m2l_white_img(tmp_path_factory, tmp_gray1_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3411,7 +3175,7 @@ def tiff_ccitt_lsb_m2l_white_img(tmp_path_factory, tmp_gray1_png):
     assert (
         identify[0]["image"].get("properties", {}).get("tiff:rows-per-strip") == "60"
     ), str(identify)
-    tiffinfo = subprocess.check_output(["tiffinfo", str(in_img)])
+    tiffinfo = subprocess.check_output(["tiffinfo", str(in_img)]).decode("utf8")
     expected = [
         r"^  Image Width: 60 Image Length: 60",
         r"^  Bits/Sample: 1",
@@ -3422,9 +3186,7 @@ def tiff_ccitt_lsb_m2l_white_img(tmp_path_factory, tmp_gray1_png):
         r"^  Rows/Strip: 60",
     ]
     for e in expected:
-        assert re.search(e, tiffinfo.decode("utf8"), re.MULTILINE), identify.decode(
-            "utf8"
-        )
+        assert re.search(e, tiffinfo, re.MULTILINE), tiffinfo
     yield in_img
     in_img.unlink()
 
@@ -3449,13 +3211,8 @@ def tiff_ccitt_msb_m2l_white_img(tmp_path_factory, tmp_gray1_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3493,7 +3250,7 @@ def tiff_ccitt_msb_m2l_white_img(tmp_path_factory, tmp_gray1_png):
     assert (
         identify[0]["image"].get("properties", {}).get("tiff:rows-per-strip") == "60"
     ), str(identify)
-    tiffinfo = subprocess.check_output(["tiffinfo", str(in_img)])
+    tiffinfo = subprocess.check_output(["tiffinfo", str(in_img)]).decode("utf8")
     expected = [
         r"^  Image Width: 60 Image Length: 60",
         r"^  Bits/Sample: 1",
@@ -3504,9 +3261,7 @@ def tiff_ccitt_msb_m2l_white_img(tmp_path_factory, tmp_gray1_png):
         r"^  Rows/Strip: 60",
     ]
     for e in expected:
-        assert re.search(e, tiffinfo.decode("utf8"), re.MULTILINE), identify.decode(
-            "utf8"
-        )
+        assert re.search(e, tiffinfo, re.MULTILINE), tiffinfo
     yield in_img
     in_img.unlink()
 
@@ -3531,13 +3286,8 @@ def tiff_ccitt_msb_l2m_white_img(tmp_path_factory, tmp_gray1_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3575,7 +3325,7 @@ def tiff_ccitt_msb_l2m_white_img(tmp_path_factory, tmp_gray1_png):
     assert (
         identify[0]["image"].get("properties", {}).get("tiff:rows-per-strip") == "60"
     ), str(identify)
-    tiffinfo = subprocess.check_output(["tiffinfo", str(in_img)])
+    tiffinfo = subprocess.check_output(["tiffinfo", str(in_img)]).decode("utf8")
     expected = [
         r"^  Image Width: 60 Image Length: 60",
         r"^  Bits/Sample: 1",
@@ -3586,9 +3336,7 @@ def tiff_ccitt_msb_l2m_white_img(tmp_path_factory, tmp_gray1_png):
         r"^  Rows/Strip: 60",
     ]
     for e in expected:
-        assert re.search(e, tiffinfo.decode("utf8"), re.MULTILINE), identify.decode(
-            "utf8"
-        )
+        assert re.search(e, tiffinfo, re.MULTILINE), tiffinfo
     yield in_img
     in_img.unlink()
 
@@ -3618,13 +3366,8 @@ def tiff_ccitt_lsb_m2l_black_img(tmp_path_factory, tmp_gray1_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3662,7 +3405,7 @@ def tiff_ccitt_lsb_m2l_black_img(tmp_path_factory, tmp_gray1_png):
     assert (
         identify[0]["image"].get("properties", {}).get("tiff:rows-per-strip") == "60"
     ), str(identify)
-    tiffinfo = subprocess.check_output(["tiffinfo", str(in_img)])
+    tiffinfo = subprocess.check_output(["tiffinfo", str(in_img)]).decode("utf8")
     expected = [
         r"^  Image Width: 60 Image Length: 60",
         r"^  Bits/Sample: 1",
@@ -3673,9 +3416,7 @@ def tiff_ccitt_lsb_m2l_black_img(tmp_path_factory, tmp_gray1_png):
         r"^  Rows/Strip: 60",
     ]
     for e in expected:
-        assert re.search(e, tiffinfo.decode("utf8"), re.MULTILINE), identify.decode(
-            "utf8"
-        )
+        assert re.search(e, tiffinfo, re.MULTILINE), tiffinfo
     yield in_img
     in_img.unlink()
 
@@ -3709,13 +3450,8 @@ def tiff_ccitt_nometa1_img(tmp_path_factory, tmp_gray1_png):
     subprocess.check_call(
         ["tiffset", "-u", "277", str(in_img)]
     )  # remove SamplesPerPixel (277)
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3753,7 +3489,7 @@ def tiff_ccitt_nometa1_img(tmp_path_factory, tmp_gray1_png):
     assert (
         identify[0]["image"].get("properties", {}).get("tiff:rows-per-strip") == "60"
     ), str(identify)
-    tiffinfo = subprocess.check_output(["tiffinfo", str(in_img)])
+    tiffinfo = subprocess.check_output(["tiffinfo", str(in_img)]).decode("utf8")
     expected = [
         r"^  Image Width: 60 Image Length: 60",
         r"^  Compression Scheme: CCITT Group 4",
@@ -3761,12 +3497,10 @@ def tiff_ccitt_nometa1_img(tmp_path_factory, tmp_gray1_png):
         r"^  Rows/Strip: 60",
     ]
     for e in expected:
-        assert re.search(e, tiffinfo.decode("utf8"), re.MULTILINE), identify.decode(
-            "utf8"
-        )
+        assert re.search(e, tiffinfo, re.MULTILINE), tiffinfo
     unexpected = [" Bits/Sample: ", " FillOrder: ", " Samples/Pixel: "]
     for e in unexpected:
-        assert e not in tiffinfo.decode("utf8")
+        assert e not in tiffinfo, tiffinfo
     yield in_img
     in_img.unlink()
 
@@ -3794,13 +3528,8 @@ def tiff_ccitt_nometa2_img(tmp_path_factory, tmp_gray1_png):
     subprocess.check_call(
         ["tiffset", "-u", "278", str(in_img)]
     )  # remove RowsPerStrip (278)
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "TIFF", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/tiff", str(identify)
@@ -3831,7 +3560,7 @@ def tiff_ccitt_nometa2_img(tmp_path_factory, tmp_gray1_png):
         == "min-is-white"
     ), str(identify)
     assert "tiff:rows-per-strip" not in identify[0]["image"]["properties"]
-    tiffinfo = subprocess.check_output(["tiffinfo", str(in_img)])
+    tiffinfo = subprocess.check_output(["tiffinfo", str(in_img)]).decode("utf8")
     expected = [
         r"^  Image Width: 60 Image Length: 60",
         r"^  Bits/Sample: 1",
@@ -3841,12 +3570,10 @@ def tiff_ccitt_nometa2_img(tmp_path_factory, tmp_gray1_png):
         r"^  Samples/Pixel: 1",
     ]
     for e in expected:
-        assert re.search(e, tiffinfo.decode("utf8"), re.MULTILINE), identify.decode(
-            "utf8"
-        )
+        assert re.search(e, tiffinfo, re.MULTILINE), tiffinfo
     unexpected = [" Rows/Strip: "]
     for e in unexpected:
-        assert e not in tiffinfo.decode("utf8")
+        assert e not in tiffinfo, tiffinfo
     yield in_img
     in_img.unlink()
 
@@ -3863,13 +3590,8 @@ def miff_cmyk8_img(tmp_path_factory, tmp_normal_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "MIFF", str(identify)
     assert identify[0]["image"].get("class") == "DirectClass"
@@ -3907,13 +3629,8 @@ def miff_cmyk16_img(tmp_path_factory, tmp_normal_png):
             str(in_img),
         ]
     )
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "MIFF", str(identify)
     assert identify[0]["image"].get("class") == "DirectClass"
@@ -3942,13 +3659,8 @@ def miff_cmyk16_img(tmp_path_factory, tmp_normal_png):
 def miff_rgb8_img(tmp_path_factory, tmp_normal_png):
     in_img = tmp_path_factory.mktemp("miff_rgb8") / "in.miff"
     subprocess.check_call(CONVERT + [str(tmp_normal_png), str(in_img)])
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "MIFF", str(identify)
     assert identify[0]["image"].get("class") == "DirectClass"
@@ -3975,13 +3687,8 @@ def miff_rgb8_img(tmp_path_factory, tmp_normal_png):
 @pytest.fixture(scope="session")
 def png_icc_img(tmp_icc_png):
     in_img = tmp_icc_png
-    identify = json.loads(subprocess.check_output(CONVERT + [str(in_img), "json:"]))
+    identify = identify_json(in_img)
     assert len(identify) == 1
-    # somewhere between imagemagick 6.9.7.4 and 6.9.9.34, the json output was
-    # put into an array, here we cater for the older version containing just
-    # the bare dictionary
-    if "image" in identify:
-        identify = [identify]
     assert "image" in identify[0]
     assert identify[0]["image"].get("format") == "PNG", str(identify)
     assert identify[0]["image"].get("mimeType") == "image/png", str(identify)
@@ -4851,10 +4558,8 @@ def gif_animation_pdf(tmp_path_factory, gif_animation_img, request):
             str(gif_animation_img),
         ]
     )
-    pdfinfo = subprocess.check_output(["pdfinfo", str(out_pdf)])
-    assert re.search(
-        "^Pages: +2$", pdfinfo.decode("utf8"), re.MULTILINE
-    ), identify.decode("utf8")
+    pdfinfo = subprocess.check_output(["pdfinfo", str(out_pdf)]).decode("utf8")
+    assert re.search("^Pages: +2$", pdfinfo, re.MULTILINE), pdfinfo
     subprocess.check_call(["pdfseparate", str(out_pdf), str(tmpdir / "page-%d.pdf")])
     for page in [1, 2]:
         gif_animation_pdf_nr = tmpdir / ("page-%d.pdf" % page)
@@ -5069,10 +4774,8 @@ def tiff_multipage_pdf(tmp_path_factory, tiff_multipage_img, request):
             str(tiff_multipage_img),
         ]
     )
-    pdfinfo = subprocess.check_output(["pdfinfo", str(out_pdf)])
-    assert re.search(
-        "^Pages: +2$", pdfinfo.decode("utf8"), re.MULTILINE
-    ), identify.decode("utf8")
+    pdfinfo = subprocess.check_output(["pdfinfo", str(out_pdf)]).decode("utf8")
+    assert re.search("^Pages: +2$", pdfinfo, re.MULTILINE), pdfinfo
     subprocess.check_call(["pdfseparate", str(out_pdf), str(tmpdir / "page-%d.pdf")])
     for page in [1, 2]:
         tiff_multipage_pdf_nr = tmpdir / ("page-%d.pdf" % page)
@@ -6870,6 +6573,55 @@ def general_input(request):
     return request.param
 
 
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["in1.jpg"],
+        ["in1.jpg", "in2.jpg"],
+        ["-o", "out.pdf", "in1.jpg"],
+        ["in1.jpg", "in2.jpg", "--output", "out.pdf"],
+    ],
+)
+def test_parse_fast_args(tmp_path, monkeypatch, argv):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "in1.jpg").write_bytes(b"\xff")
+    (tmp_path / "in2.jpg").write_bytes(b"\xff")
+    fast = img2pdf.parse_fast_args(argv)
+    full = img2pdf.get_main_parser().parse_args(argv)
+    # the output files are opened by both and only compared by their name
+    fast_output, full_output = fast.output, full.output
+    fast.output = full.output = None
+    try:
+        assert fast == full
+        if full_output is None:
+            assert fast_output is None
+        else:
+            assert fast_output.name == full_output.name
+            assert fast_output.mode == full_output.mode
+    finally:
+        for f in [fast_output, full_output]:
+            if f is not None:
+                f.close()
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        [],
+        ["--nodate", "in1.jpg"],
+        ["-o", "out.pdf"],
+        ["-o", "out1.pdf", "-o", "out2.pdf", "in1.jpg"],
+        ["in1.jpg", "-o", "out.pdf", "in1.jpg"],
+        ["-"],
+        ["missing.jpg"],
+    ],
+)
+def test_parse_fast_args_fallback(tmp_path, monkeypatch, argv):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "in1.jpg").write_bytes(b"\xff")
+    assert img2pdf.parse_fast_args(argv) is None
+
+
 @pytest.mark.skipif(not HAVE_FAKETIME, reason="requires faketime")
 @pytest.mark.parametrize(
     "engine,testdata,timezone,pdfa",